@@ -0,0 +1,85 @@
+"""
+Micro-benchmark for the escaping helpers of `github_action_utils`.
+
+Compares the current helpers with the previous implementation that always
+ran the chained `str.replace()` calls.
+
+Usage: python benchmarks/bench_escaping.py
+"""
+
+import os
+import sys
+import timeit
+from typing import Any, Callable, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import github_action_utils as gha_utils  # noqa: E402
+
+
+def _previous_escape_data(data: Any) -> str:
+    return (
+        gha_utils._make_string(data)
+        .replace("%", "%25")
+        .replace("\r", "%0D")
+        .replace("\n", "%0A")
+    )
+
+
+def _previous_escape_property(data: Any) -> str:
+    return _previous_escape_data(data).replace(":", "%3A").replace(",", "%2C")
+
+
+def _previous_clean_markdown_string(markdown_string: str) -> str:
+    return (
+        str(markdown_string)
+        .replace("%25", "%")
+        .replace("%0D", "\r")
+        .replace("%0A", "\n")
+    )
+
+
+INPUTS: List[Tuple[str, str, int]] = [
+    ("small", "src/github_action_utils.py", 200_000),
+    ("small escaped", "line 1\nline 2: 100%", 200_000),
+    ("4 MiB", "x" * 4 * 1024 * 1024, 20),
+    ("4 MiB escaped", "line: 100%\n" * (4 * 1024 * 1024 // 11), 20),
+]
+
+FUNCTIONS: List[Tuple[str, Callable[[Any], str], Callable[[Any], str]]] = [
+    ("_escape_data", _previous_escape_data, gha_utils._escape_data),
+    ("_escape_property", _previous_escape_property, gha_utils._escape_property),
+    (
+        "_clean_markdown_string",
+        _previous_clean_markdown_string,
+        gha_utils._clean_markdown_string,
+    ),
+]
+
+
+def _time_per_call(function: Callable[[Any], str], data: str, number: int) -> float:
+    return min(timeit.repeat(lambda: function(data), number=number, repeat=3)) / number
+
+
+def main() -> None:
+    print(
+        f"{'function':<24}{'input':<16}{'previous':>14}{'current':>14}{'speedup':>10}"
+    )
+
+    for name, previous, current in FUNCTIONS:
+        for input_name, data, number in INPUTS:
+            assert previous(data) == current(data)
+
+            previous_time = _time_per_call(previous, data, number)
+            current_time = _time_per_call(current, data, number)
+
+            print(
+                f"{name:<24}{input_name:<16}"
+                f"{previous_time * 1e6:>11.2f} us"
+                f"{current_time * 1e6:>11.2f} us"
+                f"{previous_time / current_time:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Benchmarks for the commands and file commands of `github_action_utils`.
+
+Requires `pytest-benchmark`, run with: tox -e benchmark
+"""
+
+import json
+import os
+import sys
+from typing import Any, Callable, Iterator, List, Tuple
+
+import pytest
+
+import github_action_utils as gha_utils
+
+SMALL_VALUE = "test value"
+LARGE_VALUE = "line: 100%\n" * (256 * 1024 // 11)
+
+# (value size, number of calls), large values are not repeated 100k times
+# to keep the amount of data written to disk reasonable.
+CASES: List[Tuple[str, int]] = [
+    ("small", 1),
+    ("small", 1_000),
+    ("small", 100_000),
+    ("large", 1),
+    ("large", 100),
+]
+
+VALUES = {"small": SMALL_VALUE, "large": LARGE_VALUE}
+
+
+def _rounds(calls: int) -> int:
+    # single calls are too short to time reliably with only a few rounds
+    if calls >= 100_000:
+        return 1
+    return 5 if calls >= 100 else 100
+
+
+@pytest.fixture(autouse=True)
+def environment_files(tmpdir: Any, monkeypatch: Any) -> Iterator[Any]:
+    for env_var in (
+        "GITHUB_OUTPUT",
+        "GITHUB_ENV",
+        "GITHUB_STATE",
+        "GITHUB_STEP_SUMMARY",
+        "GITHUB_EVENT_PATH",
+    ):
+        monkeypatch.setenv(env_var, tmpdir.join(env_var.lower()).strpath)
+    yield tmpdir
+
+
+@pytest.fixture
+def devnull_stdout(monkeypatch: Any) -> Iterator[None]:
+    with open(os.devnull, "w") as devnull:
+        monkeypatch.setattr(sys, "stdout", devnull)
+        yield
+
+
+def _truncate(*env_vars: str) -> Callable[[], None]:
+    def setup() -> None:
+        for env_var in env_vars:
+            open(os.environ[env_var], "w").close()
+
+    return setup
+
+
+@pytest.mark.parametrize("function", ["set_output", "set_env", "save_state"])
+@pytest.mark.parametrize("size,calls", CASES)
+def test_file_commands(benchmark: Any, function: str, size: str, calls: int) -> None:
+    set_value = getattr(gha_utils, function)
+    value = VALUES[size]
+    env_var = {
+        "set_output": "GITHUB_OUTPUT",
+        "set_env": "GITHUB_ENV",
+        "save_state": "GITHUB_STATE",
+    }[function]
+
+    def run() -> None:
+        for i in range(calls):
+            set_value(f"name_{i}", value)
+
+    benchmark.pedantic(run, setup=_truncate(env_var), rounds=_rounds(calls))
+
+
+@pytest.mark.parametrize("size,calls", CASES)
+def test_set_outputs(benchmark: Any, size: str, calls: int) -> None:
+    value = VALUES[size]
+
+    def run() -> None:
+        gha_utils.set_outputs((f"name_{i}", value) for i in range(calls))
+
+    benchmark.pedantic(run, setup=_truncate("GITHUB_OUTPUT"), rounds=_rounds(calls))
+
+
+@pytest.mark.parametrize("size,calls", CASES)
+def test_get_env(benchmark: Any, size: str, calls: int) -> None:
+    gha_utils.set_envs((f"name_{i}", VALUES[size]) for i in range(calls))
+
+    def run() -> None:
+        for i in range(calls):
+            gha_utils.get_env(f"name_{i}")
+
+    benchmark.pedantic(run, rounds=_rounds(calls))
+
+
+@pytest.mark.parametrize("size,calls", CASES)
+def test_get_workflow_environment_variables(
+    benchmark: Any, size: str, calls: int
+) -> None:
+    gha_utils.set_envs((f"name_{i}", VALUES[size]) for i in range(calls))
+
+    benchmark.pedantic(
+        gha_utils.get_workflow_environment_variables, rounds=_rounds(calls)
+    )
+
+
+@pytest.mark.parametrize("function", ["error", "warning", "notice"])
+@pytest.mark.parametrize("size,calls", CASES)
+def test_annotations(
+    benchmark: Any, devnull_stdout: None, function: str, size: str, calls: int
+) -> None:
+    annotate = getattr(gha_utils, function)
+    message = VALUES[size]
+
+    def run() -> None:
+        for i in range(calls):
+            annotate(message, title="Title", file=f"src/file_{i % 100}.py", line=i)
+
+    benchmark.pedantic(run, rounds=_rounds(calls))
+
+
+@pytest.mark.parametrize("size,calls", CASES)
+def test_emit_annotations(
+    benchmark: Any, devnull_stdout: None, size: str, calls: int
+) -> None:
+    message = VALUES[size]
+
+    def run() -> None:
+        gha_utils.emit_annotations(
+            gha_utils.Annotation(
+                "error", message, title="Title", file=f"src/file_{i % 100}.py", line=i
+            )
+            for i in range(calls)
+        )
+
+    benchmark.pedantic(run, rounds=_rounds(calls))
+
+
+@pytest.mark.parametrize("size,calls", CASES)
+def test_append_job_summary(benchmark: Any, size: str, calls: int) -> None:
+    markdown_text = VALUES[size]
+
+    def run() -> None:
+        for _ in range(calls):
+            gha_utils.append_job_summary(markdown_text)
+
+    benchmark.pedantic(
+        run, setup=_truncate("GITHUB_STEP_SUMMARY"), rounds=_rounds(calls)
+    )
+
+
+@pytest.mark.parametrize("commits", [1, 1_000, 100_000])
+def test_event_payload(benchmark: Any, commits: int) -> None:
+    with open(os.environ["GITHUB_EVENT_PATH"], "w") as f:
+        json.dump(
+            {
+                "commits": [
+                    {"id": str(i), "message": SMALL_VALUE} for i in range(commits)
+                ],
+                "repository": {"full_name": "octocat/Hello-World"},
+            },
+            f,
+        )
+
+    benchmark.pedantic(
+        gha_utils.event_payload,
+        setup=gha_utils.clear_event_payload_cache,
+        rounds=_rounds(commits),
+    )
+
+
+@pytest.mark.parametrize("commits", [1, 1_000, 100_000])
+def test_event_value(benchmark: Any, commits: int) -> None:
+    with open(os.environ["GITHUB_EVENT_PATH"], "w") as f:
+        json.dump(
+            {
+                "commits": [
+                    {"id": str(i), "message": SMALL_VALUE} for i in range(commits)
+                ],
+                "repository": {"full_name": "octocat/Hello-World"},
+            },
+            f,
+        )
+
+    benchmark.pedantic(
+        gha_utils.event_value, args=("repository.full_name",), rounds=_rounds(commits)
+    )
+
+
+@pytest.mark.parametrize("size", ["small", "large"])
+def test_escape_data(benchmark: Any, size: str) -> None:
+    benchmark(gha_utils._escape_data, VALUES[size])
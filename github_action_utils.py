@@ -1,13 +1,52 @@
-import json
+import atexit
+import itertools
+import marshal
 import os
-import subprocess
+import re
 import sys
-import uuid
+import threading
+import time
 from contextlib import contextmanager
-from functools import lru_cache
-from typing import Any, Dict, Generator, Union
+from functools import lru_cache, partial
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 from warnings import warn
 
+# Modules that are slow to import, or only needed by some of the functions,
+# are imported when they are first used to keep the import of this module fast.
+if TYPE_CHECKING:  # pragma: no cover
+    import cProfile
+    from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
 if sys.version_info >= (3, 8):
     from typing import Literal
 
@@ -23,15 +62,129 @@ if sys.version_info >= (3, 8):
         "warning",
     ]
     LogCommandTypes = Literal["debug", "error", "notice", "warning"]
+    InputTypes = Literal["bool", "int", "float", "list", "json"]
 else:
     CommandTypes = str
     LogCommandTypes = str
+    InputTypes = str
+
+T = TypeVar("T")
+
+NameValuePairs = Union[Mapping[str, Any], Iterable[Tuple[str, Any]]]
+StreamValue = Union[str, bytes, IO[Any], Iterable[Union[str, bytes]]]
 
 
 ACTION_ENV_DELIMITER: str = "__ENV_DELIMITER__"
 COMMAND_MARKER: str = "::"
 
 COMMANDS_USE_SUBPROCESS: bool = bool(os.environ.get("COMMANDS_USE_SUBPROCESS", False))
+COMMANDS_USE_DIRECT_WRITE: bool = bool(
+    os.environ.get("COMMANDS_USE_DIRECT_WRITE", False)
+)
+COMMANDS_USE_REDACTION: bool = bool(os.environ.get("COMMANDS_USE_REDACTION", False))
+FILE_COMMANDS_USE_BUFFER: bool = bool(os.environ.get("FILE_COMMANDS_USE_BUFFER", False))
+FILE_COMMANDS_USE_LOCK: bool = bool(os.environ.get("FILE_COMMANDS_USE_LOCK", False))
+FILE_COMMANDS_USE_RANDOM_DELIMITER: bool = bool(
+    os.environ.get("FILE_COMMANDS_USE_RANDOM_DELIMITER", False)
+)
+EVENT_PAYLOAD_USE_SNAPSHOT: bool = bool(
+    os.environ.get("EVENT_PAYLOAD_USE_SNAPSHOT", False)
+)
+GROUP_TIMINGS_SUMMARY: bool = bool(os.environ.get("GROUP_TIMINGS_SUMMARY", False))
+PROFILE_SUMMARY: bool = bool(os.environ.get("PROFILE_SUMMARY", False))
+
+FILE_COMMAND_BUFFER_SIZE: int = 64 * 1024
+JOB_SUMMARY_SIZE_LIMIT: int = 1024 * 1024
+OUTPUT_SIZE_LIMIT: int = 1024 * 1024
+PROFILE_TOP_FUNCTIONS: int = 25
+
+
+def _write_stdout_fd(data: str) -> None:
+    """
+    Writes data directly to the stdout file descriptor.
+    Python's `sys.stdout` buffer is flushed first so that the output stays
+    in order with previous `print()` calls and with output of child processes.
+
+    :param data: data to write
+    :returns: None
+    """
+    sys.stdout.flush()
+    view = memoryview(data.encode("utf-8"))
+
+    while view:
+        view = view[os.write(1, view) :]
+
+
+_output_lock = threading.RLock()
+_thread_output = threading.local()
+
+
+def _echo(message: str, use_subprocess: bool = False, redact: bool = True) -> None:
+    """
+    Prints a line to the GitHub Actions shell.
+
+    Lines are written with a single write while holding a lock, so lines
+    printed from multiple threads never interleave. Inside `buffer_output()`
+    the line is added to the buffer of the current thread instead.
+
+    If `COMMANDS_USE_DIRECT_WRITE` is enabled the line is written directly to
+    the stdout file descriptor, which gives the same ordering guarantee as
+    using the `subprocess` module without forking a process for each line.
+
+    If `COMMANDS_USE_REDACTION` is enabled masked values are replaced
+    with `***` before the line is written or buffered, unless `redact`
+    is False, e.g. for add-mask commands.
+
+    :param message: message string
+    :param use_subprocess: use subprocess module to echo command
+    :param redact: redact masked values if `COMMANDS_USE_REDACTION` is enabled
+    :returns: None
+    """
+    if COMMANDS_USE_REDACTION and redact:
+        message = _mask_registry.redact(message)
+
+    buffer: Optional[List[str]] = getattr(_thread_output, "buffer", None)
+
+    if buffer is not None:
+        buffer.append(message)
+        return
+
+    with _output_lock:
+        if COMMANDS_USE_DIRECT_WRITE:
+            _write_stdout_fd(f"{message}\n")
+        elif use_subprocess or COMMANDS_USE_SUBPROCESS:
+            import subprocess
+
+            subprocess.run(["echo", message])
+        else:
+            sys.stdout.write(f"{message}\n")
+
+
+@contextmanager
+def buffer_output(use_subprocess: bool = False) -> Generator[None, None, None]:
+    """
+    buffers the commands printed by the current thread and prints them
+    together on exit, so they are not mixed with the output of other threads.
+
+    :param use_subprocess: use subprocess module to echo command
+    :returns: None
+    """
+    if getattr(_thread_output, "buffer", None) is not None:
+        yield
+        return
+
+    buffer: List[str] = []
+    _thread_output.buffer = buffer
+
+    try:
+        yield
+    finally:
+        _thread_output.buffer = None
+
+        if buffer:
+            # lines are redacted when they are buffered, redacting them again
+            # would also redact the values of buffered add-mask commands
+            _echo("\n".join(buffer), use_subprocess=use_subprocess, redact=False)
 
 
 def _print_command(
@@ -60,10 +213,7 @@ def _print_command(
         f"{COMMAND_MARKER}{command_message}"
     )
 
-    if use_subprocess or COMMANDS_USE_SUBPROCESS:
-        subprocess.run(["echo", full_command])
-    else:
-        print(full_command)
+    _echo(full_command, use_subprocess=use_subprocess)
 
 
 def _make_string(data: Any) -> str:
@@ -74,6 +224,8 @@ def _make_string(data: Any) -> str:
     :returns: string representation of the value
     """
     if isinstance(data, (list, tuple, dict)):
+        import json
+
         return json.dumps(data)
     return str(data)
 
@@ -87,9 +239,13 @@ def _escape_data(data: Any) -> str:
     :param data: Any type of data to be escaped e.g. string, number, list, dict
     :returns: string after escaping
     """
-    return (
-        _make_string(data).replace("%", "%25").replace("\r", "%0D").replace("\n", "%0A")
-    )
+    string = _make_string(data)
+
+    # Scanning for the characters is much faster than `str.replace()`
+    # on large strings, and most values don't need to be escaped at all.
+    if "%" in string or "\r" in string or "\n" in string:
+        return string.replace("%", "%25").replace("\r", "%0D").replace("\n", "%0A")
+    return string
 
 
 def _escape_property(data: Any) -> str:
@@ -101,7 +257,11 @@ def _escape_property(data: Any) -> str:
     :param data: Any type of data to be escaped e.g. string, number, list, dict
     :returns: string after escaping
     """
-    return _escape_data(data).replace(":", "%3A").replace(",", "%2C")
+    string = _escape_data(data)
+
+    if ":" in string or "," in string:
+        return string.replace(":", "%3A").replace(",", "%2C")
+    return string
 
 
 def _clean_markdown_string(markdown_string: str) -> str:
@@ -111,12 +271,12 @@ def _clean_markdown_string(markdown_string: str) -> str:
     :param markdown_string: string with markdown content
     :returns: string after escaping
     """
-    return (
-        str(markdown_string)
-        .replace("%25", "%")
-        .replace("%0D", "\r")
-        .replace("%0A", "\n")
-    )
+    markdown_string = str(markdown_string)
+
+    if "%" not in markdown_string:
+        return markdown_string
+
+    return markdown_string.replace("%25", "%").replace("%0D", "\r").replace("%0A", "\n")
 
 
 def _to_camel_case(text: str) -> str:
@@ -129,15 +289,63 @@ def _to_camel_case(text: str) -> str:
     return f"{text[:1].lower()}{text.title().replace('_', '')[1:]}"
 
 
+_OPTION_KEYS: Dict[str, str] = {
+    key: _to_camel_case(key)
+    for key in ("title", "file", "col", "end_column", "line", "end_line")
+}
+
+
+@lru_cache(maxsize=1024)
+def _escape_property_cached(value: str) -> str:
+    """
+    Cached version of `_escape_property()` for string values
+    like file names and titles which repeat in annotations.
+
+    :param value: string to be escaped
+    :returns: string after escaping
+    """
+    return _escape_property(value)
+
+
+def _escape_option_value(value: Any) -> str:
+    if type(value) is str:
+        return _escape_property_cached(value)
+    return _escape_property(value)
+
+
 def _build_options_string(**kwargs: Any) -> str:
     return ",".join(
-        f"{_to_camel_case(key)}={_escape_property(value)}"
+        f"{_OPTION_KEYS.get(key) or _to_camel_case(key)}={_escape_option_value(value)}"
         for key, value in kwargs.items()
         if value is not None
     )
 
 
+def _random_delimiter() -> str:
+    """
+    Generates a unique heredoc delimiter, like the official GitHub Actions toolkit.
+
+    :returns: delimiter string
+    """
+    import uuid
+
+    return f"ghadelimiter_{uuid.uuid4()}"
+
+
 def _build_file_input(name: str, value: Any) -> bytes:
+    if FILE_COMMANDS_USE_RANDOM_DELIMITER:
+        string = _make_string(value)
+        delimiter = _random_delimiter()
+
+        if delimiter in string:
+            raise ValueError(
+                f"Unexpected input: value should not contain the delimiter {delimiter!r}"
+            )
+
+        return f"{_escape_property(name)}<<{delimiter}\n{string}\n{delimiter}\n".encode(
+            "utf-8"
+        )
+
     return (
         f"{_escape_property(name)}"
         f"<<{ACTION_ENV_DELIMITER}\n"
@@ -146,6 +354,497 @@ def _build_file_input(name: str, value: Any) -> bytes:
     )
 
 
+class FileCommandWriter:
+    """
+    Buffers records for the GitHub Actions environment files
+    (`GITHUB_OUTPUT`, `GITHUB_ENV`, `GITHUB_STATE`) and keeps a single
+    open handle per file instead of opening the file for every record.
+
+    Only complete records are ever written to a file, so if the process dies
+    buffered records may be lost but a file never ends with a partial record.
+    The writer can be shared by multiple threads.
+    """
+
+    def __init__(self, buffer_size: int = FILE_COMMAND_BUFFER_SIZE) -> None:
+        self.buffer_size = buffer_size
+        self._files: Dict[str, int] = {}
+        self._buffers: Dict[str, List[bytes]] = {}
+        self._buffer_sizes: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        atexit.register(self.close)
+
+    def write(self, path: str, record: bytes) -> None:
+        """
+        adds a complete record to the buffer of a file.
+
+        :param path: path of the environment file
+        :param record: record built by `_build_file_input()`
+        :returns: None
+        """
+        with self._lock:
+            self._buffers.setdefault(path, []).append(record)
+            self._buffer_sizes[path] = self._buffer_sizes.get(path, 0) + len(record)
+
+            if self._buffer_sizes[path] >= self.buffer_size:
+                self.flush(path)
+
+    def flush(self, path: Union[str, None] = None) -> None:
+        """
+        writes buffered records to the file(s).
+
+        :param path: path of the environment file, flushes all files if None
+        :returns: None
+        """
+        with self._lock:
+            paths = [path] if path is not None else list(self._buffers)
+
+            for file_path in paths:
+                records = self._buffers.pop(file_path, None)
+                self._buffer_sizes.pop(file_path, None)
+
+                if not records:
+                    continue
+
+                fd = self._files.get(file_path)
+
+                if fd is None:
+                    fd = self._files[file_path] = _open_for_append(file_path)
+
+                _append_file_command(fd, b"".join(records))
+
+    def close(self) -> None:
+        """
+        flushes all buffered records and closes the open files.
+
+        :returns: None
+        """
+        with self._lock:
+            try:
+                self.flush()
+            finally:
+                for fd in self._files.values():
+                    os.close(fd)
+                self._files.clear()
+
+    def _reset_after_fork(self) -> None:
+        """
+        Drops the state copied from the parent process into a forked child.
+        Records buffered by the parent are written by the parent only.
+
+        :returns: None
+        """
+        self._lock = threading.RLock()
+        self._buffers.clear()
+        self._buffer_sizes.clear()
+
+        for fd in self._files.values():
+            os.close(fd)
+        self._files.clear()
+
+
+_file_command_writer: Union[FileCommandWriter, None] = (
+    FileCommandWriter() if FILE_COMMANDS_USE_BUFFER else None
+)
+
+
+def _close_file_command_writer_at_process_exit(writer: FileCommandWriter) -> None:
+    """
+    Closes the writer when a `multiprocessing` child process exits.
+    Child processes exit with `os._exit()`, which doesn't run `atexit` handlers.
+
+    :param writer: writer of the child process
+    :returns: None
+    """
+    import multiprocessing.util
+
+    multiprocessing.util.Finalize(None, writer.close, exitpriority=0)
+
+
+def _reset_file_command_writer_after_fork() -> None:
+    """
+    Resets the file command writer in a forked child process, so records
+    buffered by the parent are not written twice, and makes sure records
+    buffered by `multiprocessing` workers are written when they exit.
+
+    :returns: None
+    """
+    writer = _file_command_writer
+
+    if writer is None:
+        return
+
+    writer._reset_after_fork()
+    multiprocessing_util = sys.modules.get("multiprocessing.util")
+
+    if multiprocessing_util is not None:
+        # the finalizers are cleared after this hook runs in a new child process,
+        # so the finalizer is added by an after fork hook of `multiprocessing`
+        multiprocessing_util.register_after_fork(
+            writer, _close_file_command_writer_at_process_exit
+        )
+
+
+if hasattr(os, "register_at_fork"):  # Python 3.7+ on Unix
+    os.register_at_fork(after_in_child=_reset_file_command_writer_after_fork)
+
+
+def _open_for_append(path: str) -> int:
+    # O_BINARY keeps Windows from translating "\n" into "\r\n"
+    flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+    return os.open(path, flags, 0o666)
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """
+    Writes all the data to a file descriptor, retrying on short writes.
+
+    :param fd: file descriptor
+    :param data: data to write
+    :returns: None
+    """
+    view = memoryview(data)
+
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def _append_file_command(fd: int, data: bytes) -> None:
+    """
+    Appends complete records to an environment file opened with `O_APPEND`.
+
+    If `FILE_COMMANDS_USE_LOCK` is enabled the data is written while holding
+    an exclusive `fcntl` lock. Streamed records are written with many writes
+    under the same lock, so every write has to take it to never end up
+    inside of a streamed record of another process.
+
+    :param fd: file descriptor opened with `O_APPEND`
+    :param data: complete records
+    :returns: None
+    """
+    if FILE_COMMANDS_USE_LOCK and fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+        try:
+            _write_all(fd, data)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        _write_all(fd, data)
+
+
+def _write_file_commands(env_var: str, records: Iterable[bytes]) -> None:
+    """
+    Writes records to the environment file referenced by `env_var`.
+    Records are consumed lazily and written in chunks of `FILE_COMMAND_BUFFER_SIZE`.
+
+    :param env_var: name of the environment variable containing the file path
+    :param records: records built by `_build_file_input()`
+    :returns: None
+    """
+    path = os.environ[env_var]
+
+    if _file_command_writer is not None:
+        for record in records:
+            _file_command_writer.write(path, record)
+        return
+
+    fd = _open_for_append(path)
+
+    try:
+        chunk: List[bytes] = []
+        chunk_size = 0
+
+        for record in records:
+            chunk.append(record)
+            chunk_size += len(record)
+
+            if chunk_size >= FILE_COMMAND_BUFFER_SIZE:
+                _append_file_command(fd, b"".join(chunk))
+                chunk = []
+                chunk_size = 0
+
+        if chunk:
+            _append_file_command(fd, b"".join(chunk))
+    finally:
+        os.close(fd)
+
+
+def _iter_name_value_pairs(values: NameValuePairs) -> Iterator[Tuple[str, Any]]:
+    """
+    Iterates over a mapping or an iterable of `(name, value)` pairs.
+
+    :param values: mapping or iterable of `(name, value)` pairs
+    :returns: iterator of `(name, value)` pairs
+    """
+    if isinstance(values, Mapping):
+        return iter(values.items())
+    return iter(values)
+
+
+def _build_file_inputs(values: NameValuePairs) -> Iterator[bytes]:
+    """
+    Lazily builds file command records for `(name, value)` pairs.
+
+    :param values: mapping or iterable of `(name, value)` pairs
+    :returns: iterator of records
+    """
+    return (
+        _build_file_input(name, value) for name, value in _iter_name_value_pairs(values)
+    )
+
+
+def _set_file_commands(env_var: str, values: NameValuePairs) -> None:
+    """
+    Writes `(name, value)` pairs to the environment file referenced by `env_var`,
+    or records them inside of `record_commands()`.
+
+    :param env_var: name of the environment variable containing the file path
+    :param values: mapping or iterable of `(name, value)` pairs
+    :returns: None
+    """
+    recorder = _get_command_recorder()
+
+    if recorder is not None:
+        recorder.file_commands[env_var].update(_iter_name_value_pairs(values))
+    else:
+        _write_file_commands(env_var, _build_file_inputs(values))
+
+
+def _iter_value_chunks(
+    value: StreamValue, chunk_size: int = FILE_COMMAND_BUFFER_SIZE
+) -> Iterator[bytes]:
+    """
+    Splits a string, bytes, file-like object or iterable of chunks
+    into UTF-8 encoded chunks without copying the whole value.
+
+    :param value: value to split
+    :param chunk_size: size of the chunks for strings, bytes and files
+    :returns: iterator of encoded chunks
+    """
+    if isinstance(value, (str, bytes)):
+        for start in range(0, len(value), chunk_size):
+            chunk = value[start : start + chunk_size]
+            yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        return
+
+    if hasattr(value, "read"):
+        chunk = value.read(chunk_size)
+
+        while chunk:
+            yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+            chunk = value.read(chunk_size)
+        return
+
+    for chunk in value:
+        yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+def _escape_data_chunk(chunk: bytes) -> bytes:
+    """
+    Escapes `%, \r, \n` characters of an encoded chunk, like `_escape_data()`.
+    These are single byte characters in UTF-8, so chunks can be escaped separately.
+
+    :param chunk: UTF-8 encoded chunk
+    :returns: chunk after escaping
+    """
+    if b"%" in chunk or b"\r" in chunk or b"\n" in chunk:
+        return chunk.replace(b"%", b"%25").replace(b"\r", b"%0D").replace(b"\n", b"%0A")
+    return chunk
+
+
+def _check_delimiter(chunks: Iterable[bytes], delimiter: bytes) -> Iterator[bytes]:
+    """
+    Passes chunks through, checking that the delimiter doesn't occur in them,
+    including across chunk boundaries.
+
+    :param chunks: UTF-8 encoded chunks of the value
+    :param delimiter: encoded delimiter
+    :returns: iterator of the chunks
+    """
+    tail = b""
+
+    for chunk in chunks:
+        if delimiter in chunk or delimiter in tail + chunk[: len(delimiter) - 1]:
+            raise ValueError(
+                f"Unexpected input: value should not contain the delimiter {delimiter!r}"
+            )
+
+        tail = (tail + chunk)[-(len(delimiter) - 1) :]
+        yield chunk
+
+
+def _write_file_command_stream(
+    env_var: str, name: str, chunks: Iterable[bytes]
+) -> None:
+    """
+    Writes one record to an environment file, escaping and writing
+    the value chunk by chunk. If `FILE_COMMANDS_USE_LOCK` is enabled the file
+    is locked until the whole record is written.
+
+    If `FILE_COMMANDS_USE_RANDOM_DELIMITER` is enabled the chunks are written
+    without escaping, using a unique delimiter which is checked against each chunk.
+
+    :param env_var: name of the environment variable containing the file path
+    :param name: name of the record
+    :param chunks: UTF-8 encoded chunks of the value
+    :returns: None
+    """
+    path = os.environ[env_var]
+
+    if _file_command_writer is not None:
+        _file_command_writer.flush(path)
+
+    fd = _open_for_append(path)
+    locked = FILE_COMMANDS_USE_LOCK and fcntl is not None
+
+    try:
+        if locked:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+
+        if FILE_COMMANDS_USE_RANDOM_DELIMITER:
+            delimiter = _random_delimiter()
+            chunks = _check_delimiter(chunks, delimiter.encode())
+        else:
+            delimiter = ACTION_ENV_DELIMITER
+            chunks = map(_escape_data_chunk, chunks)
+
+        _write_all(fd, f"{_escape_property(name)}<<{delimiter}\n".encode())
+
+        for chunk in chunks:
+            _write_all(fd, chunk)
+
+        _write_all(fd, f"\n{delimiter}\n".encode())
+    finally:
+        if locked:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def _file_name_prefix(name: str, default: str) -> str:
+    """
+    Makes a name safe to use in a file name, replacing path separators
+    and other special characters.
+
+    :param name: name to use in the file name
+    :param default: prefix used if nothing is left of the name
+    :returns: file name prefix
+    """
+    return re.sub(r"[^\w.-]+", "-", name).strip("-") or default
+
+
+def _set_file_command_stream(
+    env_var: str,
+    name: str,
+    value: StreamValue,
+    max_size: Union[int, None],
+    spill_dir: Union[str, None],
+) -> Union[str, None]:
+    """
+    Writes a large value to an environment file without building the whole record
+    in memory. Values larger than `max_size` are written to a file in `spill_dir`
+    instead, and the path of that file is used as the value.
+
+    :param env_var: name of the environment variable containing the file path
+    :param name: name of the record
+    :param value: string, bytes, file-like object or iterable of chunks
+    :param max_size: maximum size of the value in bytes, None for no limit
+    :param spill_dir: directory for values larger than `max_size`
+    :returns: path of the spilled value or None
+    """
+    chunks = _iter_value_chunks(value)
+    recorder = _get_command_recorder()
+
+    if recorder is not None:
+        recorder.file_commands[env_var][name] = b"".join(chunks).decode("utf-8")
+        return None
+
+    if max_size is None:
+        _write_file_command_stream(env_var, name, chunks)
+        return None
+
+    head: List[bytes] = []
+    head_size = 0
+
+    for chunk in chunks:
+        head.append(chunk)
+        head_size += len(chunk)
+
+        if head_size > max_size:
+            break
+    else:
+        _set_file_commands(env_var, ((name, b"".join(head).decode("utf-8")),))
+        return None
+
+    if spill_dir is None:
+        warning(
+            f"Value of {name!r} is larger than {max_size} bytes "
+            "and may be rejected by the runner.",
+            title="Value too large",
+        )
+        _write_file_command_stream(env_var, name, itertools.chain(head, chunks))
+        return None
+
+    import tempfile
+
+    prefix = _file_name_prefix(name, "value")
+
+    with tempfile.NamedTemporaryFile(
+        dir=spill_dir, prefix=f"{prefix}-", delete=False
+    ) as f:
+        for chunk in itertools.chain(head, chunks):
+            f.write(chunk)
+
+    warning(
+        f"Value of {name!r} is larger than {max_size} bytes, "
+        f"it was written to {f.name!r} instead.",
+        title="Value too large",
+    )
+    _set_file_commands(env_var, ((name, f.name),))
+    return f.name
+
+
+def _flush_file_commands(env_var: str) -> None:
+    """
+    Flushes buffered records of the environment file referenced by `env_var`.
+
+    :param env_var: name of the environment variable containing the file path
+    :returns: None
+    """
+    if _file_command_writer is not None and env_var in os.environ:
+        _file_command_writer.flush(os.environ[env_var])
+
+
+@contextmanager
+def buffer_file_commands(
+    buffer_size: int = FILE_COMMAND_BUFFER_SIZE,
+) -> Generator[FileCommandWriter, None, None]:
+    """
+    buffers `set_output()`, `set_env()` and `save_state()` records
+    and writes them to their files when the buffer is full or on exit.
+    Records buffered by an outer writer are written when the block is entered.
+
+    :param buffer_size: number of bytes to buffer per file before writing
+    :returns: the active `FileCommandWriter`
+    """
+    global _file_command_writer
+
+    previous_writer = _file_command_writer
+
+    if previous_writer is not None:
+        # records buffered before the block have to be written before its records
+        previous_writer.flush()
+
+    writer = FileCommandWriter(buffer_size=buffer_size)
+    _file_command_writer = writer
+
+    try:
+        yield writer
+    finally:
+        _file_command_writer = previous_writer
+        atexit.unregister(writer.close)
+        writer.close()
+
+
 def set_output(name: str, value: Any, use_subprocess: Union[bool, None] = None) -> None:
     """
     sets out for your workflow using GITHUB_OUTPUT file.
@@ -161,8 +860,41 @@ def set_output(name: str, value: Any, use_subprocess: Union[bool, None] = None)
             DeprecationWarning,
         )
 
-    with open(os.environ["GITHUB_OUTPUT"], "ab") as f:
-        f.write(_build_file_input(name, value))
+    _set_file_commands("GITHUB_OUTPUT", ((name, value),))
+
+
+def set_outputs(values: NameValuePairs) -> None:
+    """
+    sets multiple outputs for your workflow using GITHUB_OUTPUT file.
+
+    :param values: mapping or iterable of `(name, value)` pairs
+    :returns: None
+    """
+    _set_file_commands("GITHUB_OUTPUT", values)
+
+
+def set_output_stream(
+    name: str,
+    value: StreamValue,
+    max_size: Union[int, None] = OUTPUT_SIZE_LIMIT,
+    spill_dir: Union[str, None] = None,
+) -> Union[str, None]:
+    """
+    sets output for your workflow using GITHUB_OUTPUT file, streaming the value.
+
+    The value can be a string, bytes, a file-like object or an iterable of
+    string/bytes chunks, it's escaped and written chunk by chunk.
+    If the value is larger than `max_size` a warning is printed, and if
+    `spill_dir` is set the value is written to a file in that directory
+    and the path of the file is set as the output instead.
+
+    :param name: name of the output
+    :param value: value of the output
+    :param max_size: maximum size of the value in bytes, None for no limit
+    :param spill_dir: directory for values larger than `max_size` e.g. RUNNER_TEMP
+    :returns: path of the spilled value or None
+    """
+    return _set_file_command_stream("GITHUB_OUTPUT", name, value, max_size, spill_dir)
 
 
 def echo(message: Any, use_subprocess: bool = False) -> None:
@@ -178,10 +910,7 @@ def echo(message: Any, use_subprocess: bool = False) -> None:
     """
     message = str(message)
 
-    if use_subprocess or COMMANDS_USE_SUBPROCESS:
-        subprocess.run(["echo", message])
-    else:
-        print(message)
+    _echo(message, use_subprocess=use_subprocess)
 
 
 def debug(message: str, use_subprocess: bool = False) -> None:
@@ -200,6 +929,37 @@ def debug(message: str, use_subprocess: bool = False) -> None:
     )
 
 
+class Annotation(NamedTuple):
+    """
+    An `error`, `warning` or `notice` annotation for `emit_annotations()`.
+    """
+
+    command: LogCommandTypes
+    message: str
+    title: Union[str, None] = None
+    file: Union[str, None] = None
+    col: Union[int, None] = None
+    end_column: Union[int, None] = None
+    line: Union[int, None] = None
+    end_line: Union[int, None] = None
+
+
+def _build_annotation(annotation: Annotation) -> str:
+    options_string = _build_options_string(
+        title=annotation.title,
+        file=annotation.file,
+        col=annotation.col,
+        end_column=annotation.end_column,
+        line=annotation.line,
+        end_line=annotation.end_line,
+    )
+    return (
+        f"{COMMAND_MARKER}{annotation.command} "
+        f"{options_string}"
+        f"{COMMAND_MARKER}{annotation.message}"
+    )
+
+
 def notice(
     message: str,
     title: Union[str, None] = None,
@@ -226,10 +986,10 @@ def notice(
     :param use_subprocess: use subprocess module to echo command
     :returns: None
     """
-    _print_command(
-        "notice",
-        message,
-        options_string=_build_options_string(
+    _annotate(
+        Annotation(
+            "notice",
+            message,
             title=title,
             file=file,
             col=col,
@@ -238,7 +998,6 @@ def notice(
             end_line=end_line,
         ),
         use_subprocess=use_subprocess,
-        escape_message=False,
     )
 
 
@@ -268,10 +1027,10 @@ def warning(
     :param use_subprocess: use subprocess module to echo command
     :returns: None
     """
-    _print_command(
-        "warning",
-        message,
-        options_string=_build_options_string(
+    _annotate(
+        Annotation(
+            "warning",
+            message,
             title=title,
             file=file,
             col=col,
@@ -280,7 +1039,6 @@ def warning(
             end_line=end_line,
         ),
         use_subprocess=use_subprocess,
-        escape_message=False,
     )
 
 
@@ -310,10 +1068,10 @@ def error(
     :param use_subprocess: use subprocess module to echo command
     :returns: None
     """
-    _print_command(
-        "error",
-        message,
-        options_string=_build_options_string(
+    _annotate(
+        Annotation(
+            "error",
+            message,
             title=title,
             file=file,
             col=col,
@@ -322,28 +1080,99 @@ def error(
             end_line=end_line,
         ),
         use_subprocess=use_subprocess,
-        escape_message=False,
     )
 
 
-def save_state(name: str, value: Any, use_subprocess: Union[bool, None] = None) -> None:
+def _annotate(annotation: Annotation, use_subprocess: bool = False) -> None:
     """
-    sets state for your workflow using $GITHUB_STATE file
-    for sharing it with your workflow's pre: or post: actions.
+    Prints an annotation, or records it inside of `record_commands()`.
 
-    :param name: Name of the state environment variable (e.g: STATE_{name})
-    :param value: value of the state environment variable
+    :param annotation: annotation to print
+    :param use_subprocess: use subprocess module to echo command
     :returns: None
     """
-    if use_subprocess is not None:
+    recorder = _get_command_recorder()
+
+    if recorder is not None:
+        recorder.annotations.append(annotation)
+    else:
+        _echo(_build_annotation(annotation), use_subprocess=use_subprocess)
+
+
+def emit_annotations(
+    annotations: Iterable[Annotation],
+    deduplicate: bool = False,
+    use_subprocess: bool = False,
+) -> None:
+    """
+    prints many annotations in the GitHub Actions shell
+    using one write per batch of annotations.
+
+    Template: ::{command} file={name},line={line},endLine={endLine},title={title}::{message}
+    Example: echo "::error file=app.js,line=1,col=5,endColumn=7::Missing semicolon"
+
+    :param annotations: iterable of `Annotation`
+    :param deduplicate: skip annotations identical to an already printed one
+    :param use_subprocess: use subprocess module to echo command
+    :returns: None
+    """
+    recorder = _get_command_recorder()
+
+    if recorder is not None:
+        recorder.annotations.extend(annotations)
+        return
+
+    seen: Set[Annotation] = set()
+    batch: List[str] = []
+    batch_size = 0
+
+    for annotation in annotations:
+        if deduplicate:
+            if annotation in seen:
+                continue
+            seen.add(annotation)
+
+        command = _build_annotation(annotation)
+        batch.append(command)
+        batch_size += len(command)
+
+        if batch_size >= FILE_COMMAND_BUFFER_SIZE:
+            _echo("\n".join(batch), use_subprocess=use_subprocess)
+            batch = []
+            batch_size = 0
+
+    if batch:
+        _echo("\n".join(batch), use_subprocess=use_subprocess)
+
+
+def save_state(name: str, value: Any, use_subprocess: Union[bool, None] = None) -> None:
+    """
+    sets state for your workflow using $GITHUB_STATE file
+    for sharing it with your workflow's pre: or post: actions.
+
+    :param name: Name of the state environment variable (e.g: STATE_{name})
+    :param value: value of the state environment variable
+    :returns: None
+    """
+    if use_subprocess is not None:
         warn(
             "Argument `use_subprocess` for `save_state()` is deprecated and "
             "going to be removed in the next version.",
             DeprecationWarning,
         )
 
-    with open(os.environ["GITHUB_STATE"], "ab") as f:
-        f.write(_build_file_input(name, value))
+    _set_file_commands("GITHUB_STATE", ((name, value),))
+
+
+def save_states(values: NameValuePairs) -> None:
+    """
+    sets multiple states for your workflow using $GITHUB_STATE file
+    for sharing them with your workflow's pre: or post: actions.
+
+    :param values: mapping or iterable of `(name, value)` pairs
+    :returns: None
+    """
+    _set_file_commands("GITHUB_STATE", values)
 
 
 def get_state(name: str) -> Union[str, None]:
@@ -366,6 +1195,181 @@ def get_user_input(name: str) -> Union[str, None]:
     return os.environ.get(f"INPUT_{name.upper()}")
 
 
+def _parse_bool(value: str) -> bool:
+    """
+    Parses a boolean following the YAML 1.2 Core Schema,
+    like the official GitHub Actions toolkit.
+
+    :param value: string value
+    :returns: parsed boolean
+    """
+    if value in ("true", "True", "TRUE"):
+        return True
+    if value in ("false", "False", "FALSE"):
+        return False
+    raise TypeError(
+        f"Value {value!r} does not meet YAML 1.2 Core Schema specification. "
+        "Support boolean input list: `true | True | TRUE | false | False | FALSE`"
+    )
+
+
+def _parse_list(value: str) -> List[str]:
+    """
+    Splits a multiline or comma separated string into a list of stripped values.
+
+    :param value: string value
+    :returns: list of non-empty values
+    """
+    return [
+        item.strip()
+        for line in value.splitlines()
+        for item in line.split(",")
+        if item.strip()
+    ]
+
+
+def _parse_json(value: str) -> Any:
+    """
+    Parses a JSON user input.
+
+    :param value: raw input value
+    :returns: parsed JSON value
+    """
+    import json
+
+    return json.loads(value)
+
+
+_INPUT_PARSERS: Dict[str, Callable[[str], Any]] = {
+    "bool": _parse_bool,
+    "int": int,
+    "float": float,
+    "list": _parse_list,
+    "json": _parse_json,
+}
+
+
+_parsed_user_inputs: Dict[Tuple[str, str], Tuple[str, Any]] = {}
+
+
+def get_user_input_as(name: str, input_type: InputTypes, default: Any = None) -> Any:
+    """
+    gets user input parsed as `bool`, `int`, `float`, `list` or `json`.
+
+    `bool` follows the YAML 1.2 Core Schema like the official toolkit,
+    `list` splits multiline and comma separated values.
+    Parsed values are cached per input until the input value changes,
+    so the returned `list` or `json` objects should not be modified.
+
+    :param name: Name of the user input
+    :param input_type: one of `bool`, `int`, `float`, `list` or `json`
+    :param default: value returned if the input is not set or empty
+    :returns: parsed input value or `default`
+    """
+    key = (name.upper(), input_type)
+    value = os.environ.get(f"INPUT_{key[0]}")
+
+    if not value:
+        return default
+
+    cached = _parsed_user_inputs.get(key)
+
+    if cached is not None and cached[0] == value:
+        return cached[1]
+
+    parsed = _INPUT_PARSERS[input_type](value)
+    _parsed_user_inputs[key] = (value, parsed)
+    return parsed
+
+
+class RunnerContext:
+    """
+    Snapshot of the action inputs, states and default `GITHUB_*`/`RUNNER_*`
+    environment variables, with typed input getters that parse each input once.
+    """
+
+    __slots__ = ("inputs", "states", "variables", "_parsed_inputs")
+
+    def __init__(self, environ: Optional[Mapping[str, str]] = None) -> None:
+        self.inputs: Dict[str, str] = {}
+        self.states: Dict[str, str] = {}
+        self.variables: Dict[str, str] = {}
+        self._parsed_inputs: Dict[Tuple[str, str], Any] = {}
+
+        for key, value in (os.environ if environ is None else environ).items():
+            if key.startswith("INPUT_"):
+                self.inputs[key[6:]] = value
+            elif key.startswith("STATE_"):
+                self.states[key[6:]] = value
+            elif key.startswith(("GITHUB_", "RUNNER_")) or key == "CI":
+                self.variables[key] = value
+
+    def get_input(self, name: str) -> Union[str, None]:
+        """
+        gets user input.
+
+        :param name: Name of the user input
+        :returns: input value or None
+        """
+        return self.inputs.get(name.upper())
+
+    def get_input_as(
+        self, name: str, input_type: InputTypes, default: Any = None
+    ) -> Any:
+        """
+        gets user input parsed as `bool`, `int`, `float`, `list` or `json`.
+        The parsed value is memoised.
+
+        :param name: Name of the user input
+        :param input_type: one of `bool`, `int`, `float`, `list` or `json`
+        :param default: value returned if the input is not set or empty
+        :returns: parsed input value or `default`
+        """
+        key = (name.upper(), input_type)
+
+        try:
+            return self._parsed_inputs[key]
+        except KeyError:
+            pass
+
+        value = self.inputs.get(key[0])
+
+        if not value:
+            return default
+
+        parsed = self._parsed_inputs[key] = _INPUT_PARSERS[input_type](value)
+        return parsed
+
+    def get_state(self, name: str) -> Union[str, None]:
+        """
+        gets state value.
+
+        :param name: Name of the state (e.g: STATE_{name})
+        :returns: state value or None
+        """
+        return self.states.get(name)
+
+    def get(self, name: str) -> Union[str, None]:
+        """
+        gets a default `GITHUB_*` or `RUNNER_*` environment variable.
+
+        :param name: Name of the environment variable e.g. GITHUB_REPOSITORY
+        :returns: environment variable value or None
+        """
+        return self.variables.get(name)
+
+
+@lru_cache(maxsize=1)
+def runner_context() -> RunnerContext:
+    """
+    gets the `RunnerContext` snapshot, which is created on the first call.
+    Use `runner_context.cache_clear()` to take a new snapshot.
+
+    :returns: `RunnerContext`
+    """
+    return RunnerContext()
+
+
 def start_group(title: str, use_subprocess: bool = False) -> None:
     """
     creates an expandable group in GitHub Actions log.
@@ -392,196 +1396,1917 @@ def end_group(use_subprocess: bool = False) -> None:
     """
     message = f"{COMMAND_MARKER}endgroup{COMMAND_MARKER}"
 
-    if use_subprocess or COMMANDS_USE_SUBPROCESS:
-        subprocess.run(["echo", message])
-    else:
-        print(message)
+    _echo(message, use_subprocess=use_subprocess)
 
 
 @contextmanager
-def group(title: str, use_subprocess: bool = False) -> Generator[Any, None, None]:
+def group(
+    title: str, use_subprocess: bool = False, buffered: Union[bool, None] = None
+) -> Generator[Any, None, None]:
     """
     creates and closes an expandable group in GitHub Actions log.
 
     :param title: title of the group
     :param use_subprocess: use subprocess module to echo command
+    :param buffered: print the whole group at once when it is closed,
+        defaults to `True` outside of the main thread
     :returns: None
     """
-    start_group(title, use_subprocess=use_subprocess)
-    yield
-    end_group(use_subprocess=use_subprocess)
+    if buffered is None:
+        buffered = threading.current_thread() is not threading.main_thread()
 
+    if not buffered:
+        start_group(title, use_subprocess=use_subprocess)
+        yield
+        end_group(use_subprocess=use_subprocess)
+        return
 
-def add_mask(value: Any, use_subprocess: bool = False) -> None:
-    """
-    masking a value prevents a string or variable from being printed in the log.
+    with buffer_output(use_subprocess=use_subprocess):
+        start_group(title, use_subprocess=use_subprocess)
+        yield
+        end_group(use_subprocess=use_subprocess)
 
-    Template: ::add-mask::{value}
-    Example: echo "::add-mask::Mona The Octocat"
 
-    :param value: value to mask
-    :param use_subprocess: use subprocess module to echo command
-    :returns: None
+class GroupTiming(NamedTuple):
     """
-    _print_command("add-mask", value, use_subprocess=use_subprocess)
+    Resources used by the code run inside of a `timed_group()`.
 
-
-def begin_stop_commands(
-    token: Union[str, None] = None, use_subprocess: bool = False
-) -> str:
+    `cpu_time` is the CPU time of the whole process while the group was open.
+    `peak_rss` is the highest RSS the process reached since it started, as
+    measured when the group was closed, not the peak of the group alone.
     """
-    stops processing any workflow commands between this and `end_stop_commands()`.
 
-    Template: ::stop-commands::{token}
-    Example: echo "::stop-commands::12345"
+    title: str
+    wall_time: float
+    cpu_time: float
+    peak_rss: Union[int, None] = None
 
-    :param token: token to use for the stop command
-    :param use_subprocess: use subprocess module to echo command
-    :returns: token
+
+_group_timings: List[GroupTiming] = []
+_group_timings_lock = threading.Lock()
+_group_timings_summary_registered: bool = False
+
+
+def _peak_rss() -> Optional[int]:
     """
-    if not token:
-        token = str(uuid.uuid1())
+    Gets the peak resident set size of the current process.
 
-    _print_command(
-        "stop-commands", token, escape_message=False, use_subprocess=use_subprocess
-    )
+    :returns: peak RSS in bytes or None if it is not available
+    """
+    if resource is None:
+        return None
 
-    return token
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # `ru_maxrss` is in bytes on macOS and in kilobytes on Linux
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
 
 
-def end_stop_commands(token: str, use_subprocess: bool = False) -> None:
+def _format_peak_rss(peak_rss: Optional[int]) -> str:
     """
-    stops processing any workflow commands between this and `begin_stop_commands()`
+    Formats the peak RSS of a `GroupTiming` in MiB.
 
-    Template: ::{token}::
-    Example: echo "::{12345}::"
+    :param peak_rss: peak RSS in bytes
+    :returns: formatted peak RSS
+    """
+    return "n/a" if peak_rss is None else f"{peak_rss / (1024 * 1024):.1f} MiB"
 
-    :param token: token used for the stop command
-    :param use_subprocess: use subprocess module to echo command
+
+def _record_group_timing(timing: GroupTiming) -> None:
+    """
+    Records the timing of a group and, if `GROUP_TIMINGS_SUMMARY` is enabled,
+    writes all recorded timings to the job summary at exit.
+
+    :param timing: timing of the group
     :returns: None
     """
-    message = f"{COMMAND_MARKER}{token}{COMMAND_MARKER}"
+    global _group_timings_summary_registered
 
-    if use_subprocess or COMMANDS_USE_SUBPROCESS:
-        subprocess.run(["echo", message])
-    else:
-        print(message)
+    with _group_timings_lock:
+        _group_timings.append(timing)
+
+        if (
+            GROUP_TIMINGS_SUMMARY
+            and not _group_timings_summary_registered
+            and "GITHUB_STEP_SUMMARY" in os.environ
+        ):
+            atexit.register(append_group_timings_summary)
+            _group_timings_summary_registered = True
 
 
 @contextmanager
-def stop_commands(
-    token: Union[str, None] = None, use_subprocess: bool = False
+def timed_group(
+    title: str, use_subprocess: bool = False, buffered: Union[bool, None] = None
 ) -> Generator[Any, None, None]:
     """
-    stops processing GitHub action commands within this context manager.
+    creates and closes an expandable group in GitHub Actions log and records
+    the wall time and CPU time of the code run inside of it, and the peak RSS
+    of the process when the group is closed.
 
-    :param token: token to use for the stop command
+    The timing is printed as a debug message at the end of the group and
+    is kept for `group_timings()` and `append_group_timings_summary()`.
+    CPU time is measured for the whole process, including other threads.
+    Peak RSS is the high-water mark of the whole process since it started,
+    so a group only shows a higher value than the previous ones if it
+    used more memory than any code before it.
+
+    :param title: title of the group
     :param use_subprocess: use subprocess module to echo command
+    :param buffered: print the whole group at once when it is closed,
+        defaults to `True` outside of the main thread
     :returns: None
     """
-    stop_token = begin_stop_commands(token=token, use_subprocess=use_subprocess)
-    yield
-    end_stop_commands(stop_token, use_subprocess=use_subprocess)
+    with group(title, use_subprocess=use_subprocess, buffered=buffered):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield
+        finally:
+            timing = GroupTiming(
+                title,
+                time.perf_counter() - wall_start,
+                time.process_time() - cpu_start,
+                _peak_rss(),
+            )
+            _record_group_timing(timing)
+            debug(
+                f"{title} took {timing.wall_time:.3f}s "
+                f"(CPU {timing.cpu_time:.3f}s, "
+                f"process peak RSS {_format_peak_rss(timing.peak_rss)})",
+                use_subprocess=use_subprocess,
+            )
+
+
+def group_timings() -> List[GroupTiming]:
+    """
+    gets the timings of all `timed_group()` sections closed so far.
+
+    :returns: list of `GroupTiming` in the order the groups were closed
+    """
+    with _group_timings_lock:
+        return list(_group_timings)
 
 
-def set_env(name: str, value: Any) -> None:
+def clear_group_timings() -> None:
     """
-    sets an environment variable for your workflows $GITHUB_ENV file.
+    removes all recorded `timed_group()` timings.
 
-    :param name: name of the environment variable
-    :param value: value of the environment variable
     :returns: None
     """
-    with open(os.environ["GITHUB_ENV"], "ab") as f:
-        f.write(_build_file_input(name, value))
+    with _group_timings_lock:
+        _group_timings.clear()
 
 
-def get_workflow_environment_variables() -> Dict[str, Any]:
+def markdown_group_timings(
+    timings: Union[Iterable[GroupTiming], None] = None,
+    max_rows: Union[int, None] = None,
+) -> Iterator[str]:
     """
-    get a dictionary of all environment variables set in the GitHub Actions workflow.
+    renders a Markdown table of group timings, slowest group first.
 
-    :returns: dictionary of all environment variables
+    :param timings: timings to render, defaults to `group_timings()`
+    :param max_rows: maximum number of rows to render, the rest are counted
+    :returns: iterator of Markdown lines
     """
-    environment_variable_dict = {}
-    marker = f"<<{ACTION_ENV_DELIMITER}"
+    if timings is None:
+        timings = group_timings()
+
+    rows = (
+        (
+            timing.title,
+            f"{timing.wall_time:.3f}s",
+            f"{timing.cpu_time:.3f}s",
+            _format_peak_rss(timing.peak_rss),
+        )
+        for timing in sorted(timings, key=lambda timing: -timing.wall_time)
+    )
 
-    with open(os.environ["GITHUB_ENV"], "rb") as file:
-        for line in file:
-            decoded_line: str = line.decode("utf-8")
+    return markdown_table(
+        rows,
+        ("Group", "Wall time", "CPU time", "Process peak RSS"),
+        max_rows=max_rows,
+    )
 
-            if marker in decoded_line:
-                name, *_ = decoded_line.strip().split("<<")
 
-                try:
-                    decoded_value = next(file).decode("utf-8").strip()
-                except StopIteration:
-                    break
-            environment_variable_dict[name] = decoded_value
-    return environment_variable_dict
+def append_group_timings_summary(
+    timings: Union[Iterable[GroupTiming], None] = None,
+    max_rows: Union[int, None] = None,
+) -> None:
+    """
+    appends a table of group timings, slowest group first, to the job summary.
+    Nothing is written if there are no timings.
 
+    This is done automatically at exit if `GROUP_TIMINGS_SUMMARY` is enabled.
 
-def get_env(name: str) -> Any:
+    :param timings: timings to write, defaults to `group_timings()`
+    :param max_rows: maximum number of rows to write, the rest are counted
+    :returns: None
     """
-    gets the value of an environment variable set in the GitHub Actions workflow.
+    timings = group_timings() if timings is None else list(timings)
 
-    :param name: name of the environment variable
-    :returns: value of the environment variable or None
+    if not timings:
+        return
+
+    with JobSummary() as summary:
+        summary.write_lines(markdown_group_timings(timings, max_rows=max_rows))
+
+
+def _profile_function_label(function: Tuple[str, int, str]) -> str:
+    """
+    Formats a function of a profile, using paths relative to the
+    working directory for files inside of it.
+
+    :param function: (file name, line number, function name) of a profile
+    :returns: function label
     """
-    return os.environ.get(name) or get_workflow_environment_variables().get(name)
+    file_name, line, name = function
 
+    if file_name == "~":  # built-in function
+        return name
 
-def append_job_summary(markdown_text: str) -> None:
+    path = os.path.abspath(file_name)
+    cwd = os.path.join(os.getcwd(), "")
+
+    if path.startswith(cwd):
+        path = path[len(cwd) :]
+
+    return f"{name} ({path}:{line})"
+
+
+def markdown_profile(
+    profiler: "cProfile.Profile", top: int = PROFILE_TOP_FUNCTIONS
+) -> Iterator[str]:
     """
-    appends summery of the job to the GitHub Action Summary page.
+    renders a Markdown table of the top functions of a profile
+    by cumulative time.
 
-    :param markdown_text: string with Markdown text
-    :returns: None
+    :param profiler: `cProfile.Profile` that has been run
+    :param top: number of functions to render
+    :returns: iterator of Markdown lines
     """
-    with open(os.environ["GITHUB_STEP_SUMMARY"], "a") as f:
-        f.write(f"{_clean_markdown_string(markdown_text)}\n")
+    import pstats
+
+    stats = pstats.Stats(profiler).stats  # type: ignore[attr-defined]
+
+    # values are (primitive calls, calls, own time, cumulative time, callers)
+    rows = (
+        (
+            # labels like `<listcomp>` would be stripped as HTML tags otherwise
+            f"`{_profile_function_label(function)}`",
+            str(calls) if calls == primitive_calls else f"{calls}/{primitive_calls}",
+            f"{own_time:.3f}s",
+            f"{cumulative_time:.3f}s",
+        )
+        for function, (primitive_calls, calls, own_time, cumulative_time, _) in sorted(
+            stats.items(), key=lambda item: -item[1][3]
+        )
+    )
 
+    return markdown_table(
+        rows, ("Function", "Calls", "Own time", "Cumulative time"), max_rows=top
+    )
 
-def overwrite_job_summary(markdown_text: str) -> None:
+
+def write_profile_report(
+    profiler: "cProfile.Profile",
+    title: str = "Profile",
+    top: int = PROFILE_TOP_FUNCTIONS,
+) -> Optional[str]:
     """
-    overwrites summary of the job for the GitHub Action Summary page.
+    saves a profile to `RUNNER_TEMP` and appends a collapsible table of its
+    top functions by cumulative time to the job summary.
+    Each step is skipped if its environment variable is not set.
+
+    :param profiler: `cProfile.Profile` that has been run
+    :param title: title of the report, also used in the profile file name
+    :param top: number of functions in the table
+    :returns: path of the saved profile or None if it was not saved
+    """
+    path = None
+    runner_temp = os.environ.get("RUNNER_TEMP")
 
-    :param markdown_text: string with Markdown text
-    :returns: None
+    if runner_temp:
+        prefix = _file_name_prefix(title, "profile")
+        import tempfile
+
+        fd, path = tempfile.mkstemp(
+            prefix=f"{prefix}-", suffix=".prof", dir=runner_temp
+        )
+        os.close(fd)
+        profiler.dump_stats(path)
+
+    if "GITHUB_STEP_SUMMARY" in os.environ:
+        lines: Iterator[str] = markdown_profile(profiler, top=top)
+
+        if path:
+            lines = itertools.chain(lines, ("", f"Raw profile: `{path}`"))
+
+        with JobSummary() as summary:
+            summary.details(f"{title}: top functions by cumulative time", lines)
+
+    return path
+
+
+# only one profiler can be active at a time, enabling another one replaces it
+# on Python 3.11 and older and raises `ValueError` on Python 3.12+
+_active_profiler: Optional["cProfile.Profile"] = None
+_active_profiler_lock = threading.Lock()
+
+
+@contextmanager
+def profiled_group(
+    title: str,
+    top: int = PROFILE_TOP_FUNCTIONS,
+    use_subprocess: bool = False,
+    buffered: Union[bool, None] = None,
+) -> Generator["cProfile.Profile", None, None]:
     """
-    with open(os.environ["GITHUB_STEP_SUMMARY"], "w") as f:
-        f.write(f"{_clean_markdown_string(markdown_text)}\n")
+    creates and closes an expandable group in GitHub Actions log and profiles
+    the code run inside of it with `cProfile`, see `write_profile_report()`.
 
+    If another profiler is already active, e.g. an outer `profiled_group()`
+    or the process profiler of `PROFILE_SUMMARY`, the group is not profiled
+    separately. Its code is included in the report of the active profiler.
 
-def remove_job_summary() -> None:
+    :param title: title of the group and of the report
+    :param top: number of functions in the job summary table
+    :param use_subprocess: use subprocess module to echo command
+    :param buffered: print the whole group at once when it is closed,
+        defaults to `True` outside of the main thread
+    :returns: the `cProfile.Profile` used, which is the active one if any
     """
-    removes summary file for the job.
+    global _active_profiler
 
-    :returns: None
+    import cProfile
+
+    with _active_profiler_lock:
+        active_profiler = _active_profiler
+
+        if active_profiler is None:
+            profiler = _active_profiler = cProfile.Profile()
+
+    with group(title, use_subprocess=use_subprocess, buffered=buffered):
+        if active_profiler is not None:
+            debug(
+                f"{title} is not profiled separately, another profiler is active",
+                use_subprocess,
+            )
+            yield active_profiler
+            return
+
+        profiler.enable()
+
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+
+            with _active_profiler_lock:
+                _active_profiler = None
+
+            path = write_profile_report(profiler, title=title, top=top)
+
+            if path:
+                debug(f"{title} profile saved to {path}", use_subprocess)
+
+
+def _mask_pattern(values: Iterable[str]) -> Pattern[str]:
+    """
+    Compiles a regex matching any of the values, preferring the longest one.
+
+    The values are merged into a trie shaped pattern, e.g. `ab(?:c|de)?`
+    for `ab`, `abc` and `abde`, so the regex engine checks each position of
+    a string against all values at once instead of trying them one by one.
+
+    :param values: non-empty strings to match
+    :returns: compiled pattern
     """
+    trie: Dict[str, Any] = {}
+
+    for value in values:
+        node = trie
+        for char in value:
+            node = node.setdefault(char, {})
+        node[""] = {}  # a value ends here
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = []
+
+        for char, child in sorted(node.items()):
+            if not char:
+                continue
+
+            # chains of single children are merged into one literal
+            chars = [char]
+            while len(child) == 1 and "" not in child:
+                ((char, child),) = child.items()
+                chars.append(char)
+
+            branches.append(re.escape("".join(chars)) + build(child))
+
+        if not branches:
+            return ""
+
+        pattern = "|".join(branches)
+
+        if "" in node:  # a shorter value ends here, the longer ones are optional
+            return f"(?:{pattern})?"
+        return pattern if len(branches) == 1 else f"(?:{pattern})"
+
     try:
-        os.remove(os.environ["GITHUB_STEP_SUMMARY"])
-    except (KeyError, FileNotFoundError):
-        pass
+        return re.compile(build(trie))
+    except RecursionError:  # values nested too deep, e.g. a, aa, aaa, ...
+        return re.compile(
+            "|".join(re.escape(value) for value in sorted(values, key=len)[::-1])
+        )
 
 
-def add_system_path(path: str) -> None:
+class MaskRegistry:
     """
-    adds a path to the system path (`GITHUB_PATH`).
+    Keeps track of the values masked in this process, so that each value
+    is only masked once, and redacts them from strings e.g. before they are
+    written to logs or artifacts.
 
-    :param path: path string to set
-    :returns: None
+    Values masked by other processes or steps are not known to the registry.
     """
-    with open(os.environ["GITHUB_PATH"], "a") as f:
-        f.write(f"{path}")
 
+    def __init__(self) -> None:
+        self._values: Set[str] = set()
+        self._pattern: Optional[Pattern[str]] = None
+        self._lock = threading.RLock()
 
-@lru_cache(maxsize=1)
-def event_payload() -> Dict[str, Any]:
-    """
-    gets GitHub event payload data.
+    def __contains__(self, value: Any) -> bool:
+        return _make_string(value) in self._values
 
-    :returns: dictionary of event payload
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, value: Any, use_subprocess: bool = False) -> bool:
+        """
+        masks a value unless it has already been masked.
+
+        :param value: value to mask
+        :param use_subprocess: use subprocess module to echo command
+        :returns: True if the value was masked, False if it was already masked
+        """
+        return self.add_many((value,), use_subprocess=use_subprocess) == 1
+
+    def add_many(self, values: Iterable[Any], use_subprocess: bool = False) -> int:
+        """
+        masks all values that have not been masked yet,
+        printing their commands with a single write.
+        Empty values are skipped because they can not be masked.
+
+        :param values: iterable of values to mask
+        :param use_subprocess: use subprocess module to echo command
+        :returns: number of values that were masked
+        """
+        commands = []
+
+        with self._lock:
+            for value in values:
+                string = _make_string(value)
+
+                if not string or string in self._values:
+                    continue
+
+                self._values.add(string)
+                commands.append(
+                    f"{COMMAND_MARKER}add-mask {COMMAND_MARKER}{_escape_data(string)}"
+                )
+
+            if commands:
+                self._pattern = None
+                # the commands must contain the values, so they are not redacted
+                _echo("\n".join(commands), use_subprocess=use_subprocess, redact=False)
+
+        return len(commands)
+
+    def redact(self, text: str, replacement: str = "***") -> str:
+        """
+        replaces all masked values in a string, longest values first.
+
+        :param text: string to redact
+        :param replacement: string used instead of the masked values
+        :returns: redacted string
+        """
+        if not self._values:
+            return text
+
+        pattern = self._pattern
+
+        if pattern is None:
+            with self._lock:
+                if self._pattern is None:
+                    self._pattern = _mask_pattern(self._values)
+                pattern = self._pattern
+
+        return pattern.sub(replacement.replace("\\", "\\\\"), text)
+
+    def clear(self) -> None:
+        """
+        forgets all masked values. Values stay masked in the GitHub Actions log.
+
+        :returns: None
+        """
+        with self._lock:
+            self._values.clear()
+            self._pattern = None
+
+
+_mask_registry = MaskRegistry()
+
+
+def add_mask(value: Any, use_subprocess: bool = False) -> None:
     """
-    with open(os.environ["GITHUB_EVENT_PATH"]) as f:
-        data: Dict[str, Any] = json.load(f)
-    return data
+    masking a value prevents a string or variable from being printed in the log.
+    Values that have already been masked in this process are skipped.
+
+    Template: ::add-mask::{value}
+    Example: echo "::add-mask::Mona The Octocat"
+
+    :param value: value to mask
+    :param use_subprocess: use subprocess module to echo command
+    :returns: None
+    """
+    _mask_registry.add(value, use_subprocess=use_subprocess)
+
+
+def add_masks(values: Iterable[Any], use_subprocess: bool = False) -> int:
+    """
+    masks many values using one write, skipping values that have already
+    been masked in this process.
+
+    :param values: iterable of values to mask
+    :param use_subprocess: use subprocess module to echo command
+    :returns: number of values that were masked
+    """
+    return _mask_registry.add_many(values, use_subprocess=use_subprocess)
+
+
+def redact(text: str, replacement: str = "***") -> str:
+    """
+    replaces the values masked in this process in a string,
+    e.g. before writing it to a file that is uploaded as an artifact.
+
+    :param text: string to redact
+    :param replacement: string used instead of the masked values
+    :returns: redacted string
+    """
+    return _mask_registry.redact(text, replacement=replacement)
+
+
+def begin_stop_commands(
+    token: Union[str, None] = None, use_subprocess: bool = False
+) -> str:
+    """
+    stops processing any workflow commands between this and `end_stop_commands()`.
+
+    Template: ::stop-commands::{token}
+    Example: echo "::stop-commands::12345"
+
+    :param token: token to use for the stop command
+    :param use_subprocess: use subprocess module to echo command
+    :returns: token
+    """
+    if not token:
+        import uuid
+
+        token = str(uuid.uuid1())
+
+    _print_command(
+        "stop-commands", token, escape_message=False, use_subprocess=use_subprocess
+    )
+
+    return token
+
+
+def end_stop_commands(token: str, use_subprocess: bool = False) -> None:
+    """
+    stops processing any workflow commands between this and `begin_stop_commands()`
+
+    Template: ::{token}::
+    Example: echo "::{12345}::"
+
+    :param token: token used for the stop command
+    :param use_subprocess: use subprocess module to echo command
+    :returns: None
+    """
+    message = f"{COMMAND_MARKER}{token}{COMMAND_MARKER}"
+
+    _echo(message, use_subprocess=use_subprocess)
+
+
+@contextmanager
+def stop_commands(
+    token: Union[str, None] = None, use_subprocess: bool = False
+) -> Generator[Any, None, None]:
+    """
+    stops processing GitHub action commands within this context manager.
+
+    :param token: token to use for the stop command
+    :param use_subprocess: use subprocess module to echo command
+    :returns: None
+    """
+    stop_token = begin_stop_commands(token=token, use_subprocess=use_subprocess)
+    yield
+    end_stop_commands(stop_token, use_subprocess=use_subprocess)
+
+
+def set_env(name: str, value: Any) -> None:
+    """
+    sets an environment variable for your workflows $GITHUB_ENV file.
+
+    :param name: name of the environment variable
+    :param value: value of the environment variable
+    :returns: None
+    """
+    _set_file_commands("GITHUB_ENV", ((name, value),))
+
+
+def set_envs(values: NameValuePairs) -> None:
+    """
+    sets multiple environment variables for your workflows $GITHUB_ENV file.
+
+    :param values: mapping or iterable of `(name, value)` pairs
+    :returns: None
+    """
+    _set_file_commands("GITHUB_ENV", values)
+
+
+def set_env_stream(
+    name: str,
+    value: StreamValue,
+    max_size: Union[int, None] = OUTPUT_SIZE_LIMIT,
+    spill_dir: Union[str, None] = None,
+) -> Union[str, None]:
+    """
+    sets an environment variable for your workflows $GITHUB_ENV file,
+    streaming the value. See `set_output_stream()`.
+
+    :param name: name of the environment variable
+    :param value: value of the environment variable
+    :param max_size: maximum size of the value in bytes, None for no limit
+    :param spill_dir: directory for values larger than `max_size` e.g. RUNNER_TEMP
+    :returns: path of the spilled value or None
+    """
+    return _set_file_command_stream("GITHUB_ENV", name, value, max_size, spill_dir)
+
+
+def _iter_file_command_records(
+    file: BinaryIO, allow_unterminated: bool = False
+) -> Iterator[Tuple[str, str, int]]:
+    """
+    Parses `name=value` and `name<<delimiter` records from an environment file.
+
+    Incomplete records (heredoc records without their closing delimiter and,
+    unless `allow_unterminated` is set, a last line without a newline)
+    are not yielded, so a file can be parsed again from the end of the last
+    yielded record after more data has been appended to it.
+
+    :param file: environment file opened in binary mode
+    :param allow_unterminated: yield a last `name=value` line without a newline
+    :returns: iterator of `(name, value, end_offset)` where `end_offset` is the
+        number of bytes read from the start position up to the end of the record
+    """
+    offset = 0
+    name: Union[str, None] = None
+    delimiter = ""
+    value_lines: List[str] = []
+
+    for line in file:
+        offset += len(line)
+        terminated = line.endswith(b"\n")
+        decoded_line = line.decode("utf-8")
+
+        if terminated:
+            decoded_line = decoded_line[:-1]
+        if decoded_line.endswith("\r"):
+            decoded_line = decoded_line[:-1]
+
+        if name is not None:
+            if decoded_line == delimiter:
+                yield name, "\n".join(value_lines), offset
+                name = None
+            elif terminated:
+                value_lines.append(decoded_line)
+            continue
+
+        equals_index = decoded_line.find("=")
+        heredoc_index = decoded_line.find("<<")
+
+        if equals_index >= 0 and (heredoc_index < 0 or equals_index < heredoc_index):
+            if terminated or allow_unterminated:
+                yield decoded_line[:equals_index], decoded_line[
+                    equals_index + 1 :
+                ], offset
+        elif heredoc_index >= 0 and terminated:
+            name = decoded_line[:heredoc_index]
+            delimiter = decoded_line[heredoc_index + 2 :]
+            value_lines = []
+
+
+def iter_file_commands(path: str) -> Generator[Tuple[str, str], None, None]:
+    """
+    streams the records of an environment file
+    (e.g. `GITHUB_ENV`, `GITHUB_OUTPUT` or `GITHUB_STATE`).
+
+    Supports both `name=value` and multi-line `name<<delimiter` records
+    with any delimiter, without loading the whole file into memory.
+
+    :param path: path of the environment file
+    :returns: generator of `(name, value)` pairs
+    """
+    if _file_command_writer is not None:
+        _file_command_writer.flush(path)
+
+    with open(path, "rb") as file:
+        for name, value, _ in _iter_file_command_records(file, allow_unterminated=True):
+            yield name, value
+
+
+def get_workflow_environment_variables() -> Dict[str, Any]:
+    """
+    get a dictionary of all environment variables set in the GitHub Actions workflow.
+
+    :returns: dictionary of all environment variables
+    """
+    return dict(iter_file_commands(os.environ["GITHUB_ENV"]))
+
+
+class _EnvFileIndex:
+    """
+    Index of the variables in the `GITHUB_ENV` file which only parses
+    the bytes appended to the file since the last lookup.
+    """
+
+    def __init__(self) -> None:
+        self.path: Union[str, None] = None
+        self.offset = 0
+        self.size = -1
+        self.mtime = -1
+        self.variables: Dict[str, str] = {}
+        self.provisional: Dict[str, str] = {}
+
+    def _reset(self, path: str) -> None:
+        self.path = path
+        self.offset = 0
+        self.size = -1
+        self.mtime = -1
+        self.variables = {}
+        self.provisional = {}
+
+    def _lookup(self) -> Dict[str, str]:
+        if self.provisional:
+            return {**self.variables, **self.provisional}
+        return self.variables
+
+    def refresh(self, path: str) -> Dict[str, str]:
+        """
+        updates the index with the records appended to the file.
+
+        A last `name=value` line without a newline is indexed provisionally:
+        it is returned but parsed again once more data is appended to it.
+
+        :param path: path of the `GITHUB_ENV` file
+        :returns: dictionary of the indexed environment variables
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._reset(path)
+            return self.variables
+
+        if path == self.path and stat.st_size == self.size:
+            if stat.st_mtime_ns == self.mtime:
+                return self._lookup()
+            self._reset(path)
+        elif path != self.path or stat.st_size < self.offset:
+            self._reset(path)
+
+        self.provisional = {}
+
+        if stat.st_size > self.offset:
+            with open(path, "rb") as f:
+                f.seek(self.offset)
+                start = self.offset
+                # a record is only committed once the next one has been read,
+                # as the last one may be a line without its newline yet
+                pending: Union[Tuple[str, str, int], None] = None
+
+                for name, value, end_offset in _iter_file_command_records(
+                    f, allow_unterminated=True
+                ):
+                    if pending is not None:
+                        self.variables[pending[0]] = pending[1]
+                        self.offset = pending[2]
+                    pending = name, value, start + end_offset
+
+                if pending is not None:
+                    f.seek(pending[2] - 1)
+
+                    if f.read(1) == b"\n":
+                        self.variables[pending[0]] = pending[1]
+                        self.offset = pending[2]
+                    else:
+                        self.provisional[pending[0]] = pending[1]
+
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime_ns
+        return self._lookup()
+
+
+_env_file_index = _EnvFileIndex()
+
+
+def get_env(name: str) -> Any:
+    """
+    gets the value of an environment variable set in the GitHub Actions workflow.
+
+    :param name: name of the environment variable
+    :returns: value of the environment variable or None
+    """
+    value = os.environ.get(name)
+
+    if value:
+        return value
+
+    _flush_file_commands("GITHUB_ENV")
+    return _env_file_index.refresh(os.environ["GITHUB_ENV"]).get(name)
+
+
+def append_job_summary(markdown_text: str) -> None:
+    """
+    appends summery of the job to the GitHub Action Summary page.
+
+    :param markdown_text: string with Markdown text
+    :returns: None
+    """
+    with open(os.environ["GITHUB_STEP_SUMMARY"], "a") as f:
+        f.write(f"{_clean_markdown_string(markdown_text)}\n")
+
+
+def overwrite_job_summary(markdown_text: str) -> None:
+    """
+    overwrites summary of the job for the GitHub Action Summary page.
+
+    :param markdown_text: string with Markdown text
+    :returns: None
+    """
+    with open(os.environ["GITHUB_STEP_SUMMARY"], "w") as f:
+        f.write(f"{_clean_markdown_string(markdown_text)}\n")
+
+
+def remove_job_summary() -> None:
+    """
+    removes summary file for the job.
+
+    :returns: None
+    """
+    try:
+        os.remove(os.environ["GITHUB_STEP_SUMMARY"])
+    except (KeyError, FileNotFoundError):
+        pass
+
+
+def _escape_markdown_cells(cells: Iterable[Any]) -> str:
+    """
+    Joins the cells of a Markdown table row, escaping all of them in one pass.
+
+    :param cells: cell values
+    :returns: Markdown table row
+    """
+    row = "\0".join(str(cell) for cell in cells)
+
+    if "|" in row or "\n" in row or "\r" in row:
+        row = row.replace("|", "\\|").replace("\r", "").replace("\n", "<br>")
+
+    return f"| {row.replace(chr(0), ' | ')} |"
+
+
+def _truncation_footer(remaining: Iterator[Any], name: str) -> Iterator[str]:
+    """
+    Yields a footer with the number of items left in an iterator, if any.
+
+    :param remaining: partially consumed iterator
+    :param name: name of the truncated items e.g. rows, items
+    :returns: iterator of Markdown lines
+    """
+    count = sum(1 for _ in remaining)
+
+    if count:
+        yield ""
+        yield f"_{count} more {name} truncated_"
+
+
+def markdown_table(
+    rows: Iterable[Sequence[Any]],
+    header: Sequence[Any],
+    max_rows: Union[int, None] = None,
+) -> Iterator[str]:
+    """
+    renders a Markdown table from an iterable of rows, line by line.
+
+    :param rows: iterable of table rows
+    :param header: table header cells
+    :param max_rows: maximum number of rows to render, the rest are counted
+    :returns: iterator of Markdown lines
+    """
+    rows = iter(rows)
+
+    yield _escape_markdown_cells(header)
+    yield f"|{'---|' * len(header)}"
+
+    for index, row in enumerate(rows):
+        if max_rows is not None and index >= max_rows:
+            yield from _truncation_footer(itertools.chain((row,), rows), "rows")
+            break
+        yield _escape_markdown_cells(row)
+
+
+def markdown_list(
+    items: Iterable[Any],
+    ordered: bool = False,
+    max_items: Union[int, None] = None,
+) -> Iterator[str]:
+    """
+    renders a Markdown list from an iterable of items, line by line.
+
+    :param items: iterable of list items
+    :param ordered: render a numbered list
+    :param max_items: maximum number of items to render, the rest are counted
+    :returns: iterator of Markdown lines
+    """
+    items = iter(items)
+
+    for index, item in enumerate(items):
+        if max_items is not None and index >= max_items:
+            yield from _truncation_footer(itertools.chain((item,), items), "items")
+            break
+        marker = f"{index + 1}." if ordered else "-"
+        yield f"{marker} {str(item).replace(chr(10), ' ')}"
+
+
+def markdown_code_block(code: str, language: str = "") -> Iterator[str]:
+    """
+    renders a fenced Markdown code block.
+
+    :param code: code to display
+    :param language: language used for syntax highlighting
+    :returns: iterator of Markdown lines
+    """
+    yield f"```{language}"
+    yield code
+    yield "```"
+
+
+def markdown_details(summary: str, lines: Iterable[str]) -> Iterator[str]:
+    """
+    renders a collapsible section with the given lines as its content.
+
+    :param summary: text shown when the section is collapsed
+    :param lines: iterable of Markdown lines
+    :returns: iterator of Markdown lines
+    """
+    yield "<details>"
+    yield f"<summary>{summary}</summary>"
+    yield ""
+    yield from lines
+    yield ""
+    yield "</details>"
+
+
+class JobSummary:
+    """
+    Writes the summary of the job to the GitHub Action Summary page
+    incrementally, keeping the `GITHUB_STEP_SUMMARY` file open and buffered.
+
+    The size of the summary is checked on every write so that it never
+    exceeds the GitHub Actions step summary size limit.
+    """
+
+    def __init__(
+        self,
+        overwrite: bool = False,
+        buffer_size: int = FILE_COMMAND_BUFFER_SIZE,
+        size_limit: int = JOB_SUMMARY_SIZE_LIMIT,
+    ) -> None:
+        self.size_limit = size_limit
+        self._file = open(
+            os.environ["GITHUB_STEP_SUMMARY"],
+            "wb" if overwrite else "ab",
+            buffering=buffer_size,
+        )
+        self.size = os.fstat(self._file.fileno()).st_size
+
+    def __enter__(self) -> "JobSummary":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def write(self, markdown_text: str) -> None:
+        """
+        appends Markdown text followed by a newline to the summary.
+
+        :param markdown_text: string with Markdown text
+        :returns: None
+        :raises ValueError: if the summary would exceed `size_limit`
+        """
+        self._write(f"{_clean_markdown_string(markdown_text)}\n")
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        """
+        appends Markdown lines to the summary as they are, without cleaning them.
+
+        :param lines: iterable of Markdown lines
+        :returns: None
+        :raises ValueError: if the summary would exceed `size_limit`
+        """
+        for line in lines:
+            self._write(f"{line}\n")
+
+    def _write(self, text: str) -> None:
+        data = text.encode("utf-8")
+
+        if self.size + len(data) > self.size_limit:
+            raise ValueError(
+                f"Job summary can not exceed {self.size_limit} bytes, "
+                f"{self.size} bytes are already written."
+            )
+
+        self._file.write(data)
+        self.size += len(data)
+
+    def heading(self, text: str, level: int = 1) -> None:
+        """
+        appends a Markdown heading to the summary.
+
+        :param text: heading text
+        :param level: heading level from 1 to 6
+        :returns: None
+        """
+        self.write(f"{'#' * level} {text}")
+
+    def code_block(self, code: str, language: str = "") -> None:
+        """
+        appends a fenced code block to the summary.
+
+        :param code: code to display
+        :param language: language used for syntax highlighting
+        :returns: None
+        """
+        self.write_lines(markdown_code_block(code, language=language))
+
+    def table(
+        self,
+        rows: Iterable[Sequence[Any]],
+        header: Sequence[Any],
+        max_rows: Union[int, None] = None,
+    ) -> None:
+        """
+        appends a Markdown table to the summary, writing it row by row.
+
+        :param rows: iterable of table rows
+        :param header: table header cells
+        :param max_rows: maximum number of rows to write, the rest are counted
+        :returns: None
+        """
+        self.write_lines(markdown_table(rows, header, max_rows=max_rows))
+
+    def list_items(
+        self,
+        items: Iterable[Any],
+        ordered: bool = False,
+        max_items: Union[int, None] = None,
+    ) -> None:
+        """
+        appends a Markdown list to the summary, writing it item by item.
+
+        :param items: iterable of list items
+        :param ordered: write a numbered list
+        :param max_items: maximum number of items to write, the rest are counted
+        :returns: None
+        """
+        self.write_lines(markdown_list(items, ordered=ordered, max_items=max_items))
+
+    def details(self, summary: str, lines: Iterable[str]) -> None:
+        """
+        appends a collapsible section to the summary.
+
+        :param summary: text shown when the section is collapsed
+        :param lines: iterable of Markdown lines e.g. from `markdown_table()`
+        :returns: None
+        """
+        self.write_lines(markdown_details(summary, lines))
+
+    def flush(self) -> None:
+        """
+        writes the buffered summary to the file.
+
+        :returns: None
+        """
+        self._file.flush()
+
+    def close(self) -> None:
+        """
+        writes the buffered summary to the file and closes it.
+
+        :returns: None
+        """
+        self._file.close()
+
+
+def add_system_path(path: str) -> None:
+    """
+    adds a path to the system path (`GITHUB_PATH`).
+
+    :param path: path string to set
+    :returns: None
+    """
+    with open(os.environ["GITHUB_PATH"], "a") as f:
+        f.write(f"{path}")
+
+
+EventPayloadKey = Tuple[str, int, int]
+
+_event_payload_cache: Dict[EventPayloadKey, Dict[str, Any]] = {}
+
+
+def _event_payload_key() -> EventPayloadKey:
+    """
+    Builds the cache key of the event payload file from its path,
+    modification time and size.
+
+    :returns: cache key
+    """
+    path = os.environ["GITHUB_EVENT_PATH"]
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def _event_payload_snapshot_path(key: EventPayloadKey) -> Optional[str]:
+    """
+    Gets the path of the pre-parsed event payload snapshot in `RUNNER_TEMP`.
+
+    :param key: cache key of the event payload file
+    :returns: snapshot path or None if `RUNNER_TEMP` is not set
+    """
+    runner_temp = os.environ.get("RUNNER_TEMP")
+
+    if not runner_temp:
+        return None
+
+    import hashlib
+
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+    return os.path.join(runner_temp, f"github_action_utils_event_{digest}.marshal")
+
+
+def _load_event_payload(key: EventPayloadKey, use_snapshot: bool) -> Dict[str, Any]:
+    """
+    Loads the event payload from its snapshot if possible, otherwise parses
+    the payload file and writes the snapshot for later processes.
+
+    :param key: cache key of the event payload file
+    :param use_snapshot: use the pre-parsed snapshot in `RUNNER_TEMP`
+    :returns: dictionary of event payload
+    """
+    snapshot_path = _event_payload_snapshot_path(key) if use_snapshot else None
+    data: Dict[str, Any]
+
+    if snapshot_path:
+        try:
+            with open(snapshot_path, "rb") as f:
+                data = marshal.load(f)
+            return data
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+    import json
+
+    with open(key[0]) as f:
+        data = json.load(f)
+
+    if snapshot_path:
+        temp_path = f"{snapshot_path}.{os.getpid()}"
+
+        try:
+            with open(temp_path, "wb") as f:
+                marshal.dump(data, f)
+            os.replace(temp_path, snapshot_path)
+        except (OSError, ValueError):
+            pass
+
+    return data
+
+
+def event_payload(use_snapshot: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    gets GitHub event payload data.
+
+    The payload is cached until the path, modification time or size of the
+    `GITHUB_EVENT_PATH` file changes.
+
+    :param use_snapshot: share a pre-parsed payload with the other processes
+        of the job using `RUNNER_TEMP`, defaults to `EVENT_PAYLOAD_USE_SNAPSHOT`
+    :returns: dictionary of event payload
+    """
+    key = _event_payload_key()
+    data = _event_payload_cache.get(key)
+
+    if data is None:
+        if use_snapshot is None:
+            use_snapshot = EVENT_PAYLOAD_USE_SNAPSHOT
+
+        data = _load_event_payload(key, use_snapshot)
+        _event_payload_cache.clear()
+        _event_payload_cache[key] = data
+
+    return data
+
+
+def clear_event_payload_cache() -> None:
+    """
+    clears the cached event payload data.
+
+    :returns: None
+    """
+    _event_payload_cache.clear()
+    _event_info.cache_clear()
+
+
+def _event_payload_cache_clear() -> None:
+    """
+    Deprecated `event_payload.cache_clear()`, which was available
+    when `event_payload()` was cached with `lru_cache`.
+
+    :returns: None
+    """
+    warn(
+        "`event_payload.cache_clear()` is deprecated and going to be removed "
+        "in the next version, use `clear_event_payload_cache()` instead.",
+        DeprecationWarning,
+    )
+    clear_event_payload_cache()
+
+
+event_payload.cache_clear = _event_payload_cache_clear  # type: ignore[attr-defined]
+
+
+_JSON_WHITESPACE: Pattern[bytes] = re.compile(rb"[ \t\n\r]*")
+_JSON_STRING: Pattern[bytes] = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_JSON_SCALAR: Pattern[bytes] = re.compile(rb"[^,:\]}\s]+")
+# Skips everything except the brackets, including brackets inside of strings.
+_JSON_CONTAINER_CONTENT: Pattern[bytes] = re.compile(
+    rb'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*', re.DOTALL
+)
+
+
+def _json_match(pattern: Pattern[bytes], data: Any, position: int) -> int:
+    match = pattern.match(data, position)
+
+    if match is None:
+        raise ValueError(f"Invalid JSON at position {position}")
+    return match.end()
+
+
+def _json_skip_whitespace(data: Any, position: int) -> int:
+    return _json_match(_JSON_WHITESPACE, data, position)
+
+
+def _json_value_end(data: Any, position: int) -> int:
+    """
+    Finds the end of the JSON value starting at `position` without decoding it.
+
+    :param data: JSON document as bytes or `mmap`
+    :param position: start position of the value
+    :returns: end position of the value
+    """
+    char = data[position : position + 1]
+
+    if char == b'"':
+        return _json_match(_JSON_STRING, data, position)
+
+    if char not in (b"{", b"["):
+        return _json_match(_JSON_SCALAR, data, position)
+
+    depth = 0
+
+    while True:
+        token = data[position : position + 1]
+
+        if token in (b"{", b"["):
+            depth += 1
+        elif token in (b"}", b"]"):
+            depth -= 1
+        else:
+            raise ValueError(f"Invalid JSON at position {position}")
+
+        position += 1
+
+        if depth == 0:
+            return position
+
+        position = _json_match(_JSON_CONTAINER_CONTENT, data, position)
+
+
+def _json_find_member(data: Any, position: int, key: str) -> Optional[int]:
+    """
+    Finds the position of the value of a member of the JSON object
+    starting at `position`, skipping over the values of the other members.
+
+    :param data: JSON document as bytes or `mmap`
+    :param position: start position of the object
+    :param key: name of the member
+    :returns: start position of the member value or None
+    """
+    position = _json_skip_whitespace(data, position + 1)
+
+    while data[position : position + 1] == b'"':
+        end = _json_match(_JSON_STRING, data, position)
+        raw_name = data[position + 1 : end - 1]
+        if b"\\" in raw_name:
+            import json
+
+            name = json.loads(data[position:end])
+        else:
+            name = raw_name.decode()
+        position = _json_skip_whitespace(data, end)
+
+        if data[position : position + 1] != b":":
+            raise ValueError(f"Invalid JSON at position {position}")
+
+        position = _json_skip_whitespace(data, position + 1)
+
+        if name == key:
+            return position
+
+        position = _json_skip_whitespace(data, _json_value_end(data, position))
+
+        if data[position : position + 1] != b",":
+            break
+
+        position = _json_skip_whitespace(data, position + 1)
+
+    return None
+
+
+def _json_find_item(data: Any, position: int, index: int) -> Optional[int]:
+    """
+    Finds the position of an item of the JSON array starting at `position`.
+
+    :param data: JSON document as bytes or `mmap`
+    :param position: start position of the array
+    :param index: index of the item
+    :returns: start position of the item or None
+    """
+    position = _json_skip_whitespace(data, position + 1)
+
+    if data[position : position + 1] == b"]":
+        return None
+
+    for _ in range(index):
+        position = _json_skip_whitespace(data, _json_value_end(data, position))
+
+        if data[position : position + 1] != b",":
+            return None
+
+        position = _json_skip_whitespace(data, position + 1)
+
+    return position
+
+
+def _json_find(data: Any, keys: Sequence[str]) -> Optional[Tuple[int, int]]:
+    """
+    Finds the value at a path of keys in a JSON document.
+
+    :param data: JSON document as bytes or `mmap`
+    :param keys: object member names or array indexes
+    :returns: start and end position of the value or None
+    """
+    position: Optional[int] = _json_skip_whitespace(data, 0)
+
+    for key in keys:
+        assert position is not None
+        char = data[position : position + 1]
+
+        if char == b"{":
+            position = _json_find_member(data, position, key)
+        elif char == b"[" and key.isdigit():
+            position = _json_find_item(data, position, int(key))
+        else:
+            return None
+
+        if position is None:
+            return None
+
+    assert position is not None
+    return position, _json_value_end(data, position)
+
+
+def event_value(path: str, default: Any = None) -> Any:
+    """
+    gets a value from the GitHub event payload using a dotted path,
+    e.g. `pull_request.head.sha` or `commits.0.id`.
+
+    The payload file is memory mapped and scanned only until the value is
+    found, without decoding the rest of the payload.
+
+    :param path: dotted path of object keys and array indexes
+    :param default: value returned if the path does not exist
+    :returns: value at the path or `default`
+    """
+    import json
+    import mmap
+
+    with open(os.environ["GITHUB_EVENT_PATH"], "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return default
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            span = _json_find(data, path.split("."))
+
+            if span is None:
+                return default
+
+            return json.loads(data[span[0] : span[1]])
+
+
+class EventInfo(NamedTuple):
+    """
+    Commonly used fields of the GitHub event payload.
+    """
+
+    action: Optional[str]
+    repository: Optional[str]
+    sender: Optional[str]
+    number: Optional[int]
+    ref: Optional[str]
+    sha: Optional[str]
+
+
+def _first_event_value(*paths: str) -> Any:
+    for path in paths:
+        value = event_value(path)
+
+        if value is not None:
+            return value
+    return None
+
+
+@lru_cache(maxsize=1)
+def _event_info(key: EventPayloadKey) -> EventInfo:
+    return EventInfo(
+        action=event_value("action"),
+        repository=event_value("repository.full_name"),
+        sender=event_value("sender.login"),
+        number=_first_event_value("pull_request.number", "issue.number", "number"),
+        ref=_first_event_value("pull_request.head.ref", "ref"),
+        sha=_first_event_value("pull_request.head.sha", "after"),
+    )
+
+
+def event_info() -> EventInfo:
+    """
+    gets commonly used fields of the GitHub event payload
+    without loading the whole payload.
+
+    :returns: `EventInfo` of the event payload
+    """
+    return _event_info(_event_payload_key())
+
+
+Reducer = Callable[[Any, Any], Any]
+
+
+class CommandRecorder:
+    """
+    Records outputs, environment variables, states and annotations instead of
+    writing them. Recorders are picklable, so worker processes can return them
+    to the parent process, which merges them and writes everything at once.
+    """
+
+    def __init__(self) -> None:
+        self.file_commands: Dict[str, Dict[str, Any]] = {
+            "GITHUB_OUTPUT": {},
+            "GITHUB_ENV": {},
+            "GITHUB_STATE": {},
+        }
+        self.annotations: List[Annotation] = []
+
+    @property
+    def outputs(self) -> Dict[str, Any]:
+        return self.file_commands["GITHUB_OUTPUT"]
+
+    @property
+    def env(self) -> Dict[str, Any]:
+        return self.file_commands["GITHUB_ENV"]
+
+    @property
+    def states(self) -> Dict[str, Any]:
+        return self.file_commands["GITHUB_STATE"]
+
+    def merge(
+        self,
+        other: "CommandRecorder",
+        reducers: Optional[Mapping[str, Reducer]] = None,
+    ) -> None:
+        """
+        merges the records of another recorder into this one.
+        The last written value wins unless a reducer is given for the name.
+
+        :param other: recorder to merge
+        :param reducers: functions combining the current and the new value by name
+        :returns: None
+        """
+        for env_var, values in other.file_commands.items():
+            current_values = self.file_commands[env_var]
+
+            for name, value in values.items():
+                reducer = reducers.get(name) if reducers else None
+
+                if reducer is not None and name in current_values:
+                    value = reducer(current_values[name], value)
+                current_values[name] = value
+
+        self.annotations.extend(other.annotations)
+
+    def commit(self, deduplicate_annotations: bool = False) -> None:
+        """
+        writes all records with one bulk write per environment file
+        and prints the annotations in batches.
+
+        :param deduplicate_annotations: skip identical annotations
+        :returns: None
+        """
+        for env_var, values in self.file_commands.items():
+            if values:
+                _set_file_commands(env_var, values)
+
+        if self.annotations:
+            emit_annotations(self.annotations, deduplicate=deduplicate_annotations)
+
+
+_command_recorders = threading.local()
+
+
+def _get_command_recorder() -> Optional[CommandRecorder]:
+    recorder: Optional[CommandRecorder] = getattr(_command_recorders, "recorder", None)
+    return recorder
+
+
+@contextmanager
+def record_commands() -> Generator[CommandRecorder, None, None]:
+    """
+    records `set_output()`, `set_env()`, `save_state()` and the annotation
+    functions called in the current thread instead of writing them.
+
+    :returns: `CommandRecorder` with the recorded commands
+    """
+    previous_recorder = _get_command_recorder()
+    recorder = CommandRecorder()
+    _command_recorders.recorder = recorder
+
+    try:
+        yield recorder
+    finally:
+        _command_recorders.recorder = previous_recorder
+
+
+_async_writer: Optional["ThreadPoolExecutor"] = None
+
+
+def _get_async_writer() -> "ThreadPoolExecutor":
+    """
+    Gets the single background thread used by the async functions.
+    Using only one thread keeps the writes in the order they were scheduled.
+
+    :returns: single worker `ThreadPoolExecutor`
+    """
+    global _async_writer
+
+    if _async_writer is None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        _async_writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="github_action_utils"
+        )
+    return _async_writer
+
+
+def _run_with_thread_state(
+    recorder: Optional[CommandRecorder],
+    buffer: Optional[List[str]],
+    function: Callable[..., T],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    """
+    Runs a function with the `record_commands()` recorder and
+    the `buffer_output()` buffer of another thread.
+
+    :param recorder: command recorder of the calling thread
+    :param buffer: output buffer of the calling thread
+    :param function: function to run
+    :returns: return value of the function
+    """
+    _command_recorders.recorder = recorder
+    _thread_output.buffer = buffer
+
+    try:
+        return function(*args, **kwargs)
+    finally:
+        _command_recorders.recorder = None
+        _thread_output.buffer = None
+
+
+async def _run_in_async_writer(
+    function: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """
+    Runs a function in the background writer thread without blocking the event loop.
+    The function uses the `record_commands()` recorder and the `buffer_output()`
+    buffer active in the thread of the event loop.
+
+    :param function: function to run
+    :returns: return value of the function
+    """
+    import asyncio
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(
+        _get_async_writer(),
+        partial(
+            _run_with_thread_state,
+            _get_command_recorder(),
+            getattr(_thread_output, "buffer", None),
+            function,
+            *args,
+            **kwargs,
+        ),
+    )
+
+
+async def aecho(message: Any) -> None:
+    """
+    async version of `echo()`.
+
+    :param message: Any type of message e.g. string, number, list, dict
+    :returns: None
+    """
+    await _run_in_async_writer(echo, message)
+
+
+async def adebug(message: str) -> None:
+    """
+    async version of `debug()`.
+
+    :param message: message string
+    :returns: None
+    """
+    await _run_in_async_writer(debug, message)
+
+
+async def anotice(
+    message: str,
+    title: Union[str, None] = None,
+    file: Union[str, None] = None,
+    col: Union[int, None] = None,
+    end_column: Union[int, None] = None,
+    line: Union[int, None] = None,
+    end_line: Union[int, None] = None,
+) -> None:
+    """
+    async version of `notice()`.
+
+    :param message: Message to display
+    :param title: Custom title
+    :param file: Filename in the repository
+    :param col: Column number, starting at 1
+    :param end_column: End column number
+    :param line: Line number, starting at 1
+    :param end_line: End line number
+    :returns: None
+    """
+    await _run_in_async_writer(
+        notice,
+        message,
+        title=title,
+        file=file,
+        col=col,
+        end_column=end_column,
+        line=line,
+        end_line=end_line,
+    )
+
+
+async def awarning(
+    message: str,
+    title: Union[str, None] = None,
+    file: Union[str, None] = None,
+    col: Union[int, None] = None,
+    end_column: Union[int, None] = None,
+    line: Union[int, None] = None,
+    end_line: Union[int, None] = None,
+) -> None:
+    """
+    async version of `warning()`.
+
+    :param message: Message to display
+    :param title: Custom title
+    :param file: Filename in the repository
+    :param col: Column number, starting at 1
+    :param end_column: End column number
+    :param line: Line number, starting at 1
+    :param end_line: End line number
+    :returns: None
+    """
+    await _run_in_async_writer(
+        warning,
+        message,
+        title=title,
+        file=file,
+        col=col,
+        end_column=end_column,
+        line=line,
+        end_line=end_line,
+    )
+
+
+async def aerror(
+    message: str,
+    title: Union[str, None] = None,
+    file: Union[str, None] = None,
+    col: Union[int, None] = None,
+    end_column: Union[int, None] = None,
+    line: Union[int, None] = None,
+    end_line: Union[int, None] = None,
+) -> None:
+    """
+    async version of `error()`.
+
+    :param message: Message to display
+    :param title: Custom title
+    :param file: Filename in the repository
+    :param col: Column number, starting at 1
+    :param end_column: End column number
+    :param line: Line number, starting at 1
+    :param end_line: End line number
+    :returns: None
+    """
+    await _run_in_async_writer(
+        error,
+        message,
+        title=title,
+        file=file,
+        col=col,
+        end_column=end_column,
+        line=line,
+        end_line=end_line,
+    )
+
+
+async def aemit_annotations(
+    annotations: Iterable[Annotation], deduplicate: bool = False
+) -> None:
+    """
+    async version of `emit_annotations()`.
+
+    :param annotations: iterable of `Annotation`
+    :param deduplicate: skip annotations identical to an already printed one
+    :returns: None
+    """
+    await _run_in_async_writer(emit_annotations, annotations, deduplicate=deduplicate)
+
+
+async def aset_output(name: str, value: Any) -> None:
+    """
+    async version of `set_output()`.
+
+    :param name: name of the output
+    :param value: value of the output
+    :returns: None
+    """
+    await _run_in_async_writer(set_output, name, value)
+
+
+async def aset_outputs(values: NameValuePairs) -> None:
+    """
+    async version of `set_outputs()`.
+
+    :param values: mapping or iterable of `(name, value)` pairs
+    :returns: None
+    """
+    await _run_in_async_writer(set_outputs, values)
+
+
+async def aset_envs(values: NameValuePairs) -> None:
+    """
+    async version of `set_envs()`.
+
+    :param values: mapping or iterable of `(name, value)` pairs
+    :returns: None
+    """
+    await _run_in_async_writer(set_envs, values)
+
+
+async def asave_states(values: NameValuePairs) -> None:
+    """
+    async version of `save_states()`.
+
+    :param values: mapping or iterable of `(name, value)` pairs
+    :returns: None
+    """
+    await _run_in_async_writer(save_states, values)
+
+
+async def asave_state(name: str, value: Any) -> None:
+    """
+    async version of `save_state()`.
+
+    :param name: Name of the state environment variable (e.g: STATE_{name})
+    :param value: value of the state environment variable
+    :returns: None
+    """
+    await _run_in_async_writer(save_state, name, value)
+
+
+async def aset_env(name: str, value: Any) -> None:
+    """
+    async version of `set_env()`.
+
+    :param name: name of the environment variable
+    :param value: value of the environment variable
+    :returns: None
+    """
+    await _run_in_async_writer(set_env, name, value)
+
+
+async def aappend_job_summary(markdown_text: str) -> None:
+    """
+    async version of `append_job_summary()`.
+
+    :param markdown_text: string with Markdown text
+    :returns: None
+    """
+    await _run_in_async_writer(append_job_summary, markdown_text)
+
+
+async def aoverwrite_job_summary(markdown_text: str) -> None:
+    """
+    async version of `overwrite_job_summary()`.
+
+    :param markdown_text: string with Markdown text
+    :returns: None
+    """
+    await _run_in_async_writer(overwrite_job_summary, markdown_text)
+
+
+async def aadd_mask(value: Any) -> None:
+    """
+    async version of `add_mask()`.
+
+    :param value: value to mask
+    :returns: None
+    """
+    await _run_in_async_writer(add_mask, value)
+
+
+async def aadd_masks(values: Iterable[Any]) -> int:
+    """
+    async version of `add_masks()`.
+
+    :param values: iterable of values to mask
+    :returns: number of values that were masked
+    """
+    return await _run_in_async_writer(add_masks, values)
+
+
+async def aadd_system_path(path: str) -> None:
+    """
+    async version of `add_system_path()`.
+
+    :param path: path string to set
+    :returns: None
+    """
+    await _run_in_async_writer(add_system_path, path)
+
+
+def _write_process_profile(profiler: "cProfile.Profile") -> None:
+    """
+    Stops profiling the whole process and writes its report at exit.
+
+    :param profiler: profiler started when the module was imported
+    :returns: None
+    """
+    profiler.disable()
+    write_profile_report(profiler, title="Process profile")
+
+
+if PROFILE_SUMMARY:
+    import cProfile
+
+    _process_profiler = _active_profiler = cProfile.Profile()
+    atexit.register(_write_process_profile, _process_profiler)
+    _process_profiler.enable()
@@ -1,6 +1,14 @@
+import asyncio
+import io
 import json
+import multiprocessing
 import os
-from typing import Any
+import pstats
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Iterator, List
 from unittest import mock
 
 import pytest
@@ -24,6 +32,15 @@ def test__print_command(capfd: Any, test_input: Any, expected: str) -> None:
     assert out == expected
 
 
+@mock.patch.object(gha_utils, "COMMANDS_USE_DIRECT_WRITE", True)
+def test__print_command_direct_write(capfd: Any) -> None:
+    print("before")
+    gha_utils._print_command("debug", "test debug", use_subprocess=True)
+    gha_utils.echo("after")
+    out, err = capfd.readouterr()
+    assert out == "before\n::debug ::test debug\nafter\n"
+
+
 @pytest.mark.parametrize(
     "test_input,expected",
     [
@@ -52,6 +69,7 @@ def test__make_string(test_input: Any, expected: str) -> None:
         ("test\n", "test%0A"),
         ("%test", "%25test"),
         ("\rtest", "%0Dtest"),
+        ("100%\r\n", "100%25%0D%0A"),
     ],
 )
 def test__escape_data(test_input: str, expected: str) -> None:
@@ -64,6 +82,7 @@ def test__escape_data(test_input: str, expected: str) -> None:
         ("test", "test"),
         ("test:", "test%3A"),
         ("test,", "test%2C"),
+        ("a:b,c\n", "a%3Ab%2Cc%0A"),
     ],
 )
 def test__escape_property(test_input: str, expected: str) -> None:
@@ -117,6 +136,16 @@ def test__build_options_string(input_kwargs: Any, expected: str) -> None:
     assert gha_utils._build_options_string(**input_kwargs) == expected
 
 
+def test__build_options_string_caches_string_values() -> None:
+    gha_utils._escape_property_cached.cache_clear()
+
+    for _ in range(3):
+        gha_utils._build_options_string(file="a:b.py", line=1)
+
+    assert gha_utils._escape_property_cached.cache_info().hits == 2
+    assert gha_utils._OPTION_KEYS["end_column"] == "endColumn"
+
+
 def test__build_file_input() -> None:
     assert (
         gha_utils._build_file_input("test", "value")
@@ -124,6 +153,44 @@ def test__build_file_input() -> None:
     )
 
 
+@mock.patch.object(gha_utils, "FILE_COMMANDS_USE_RANDOM_DELIMITER", True)
+def test__build_file_input_random_delimiter() -> None:
+    value = "line 1\n100%\nline 3\n"
+    record = gha_utils._build_file_input("test", value)
+    header, *_ = record.decode().split("\n")
+    delimiter = header.split("<<")[1]
+
+    assert delimiter.startswith("ghadelimiter_")
+    assert delimiter not in gha_utils._build_file_input("test", value).decode()
+    assert record.decode() == f"test<<{delimiter}\n{value}\n{delimiter}\n"
+
+    with mock.patch.object(gha_utils, "_random_delimiter", return_value="line 3"):
+        with pytest.raises(ValueError):
+            gha_utils._build_file_input("test", value)
+
+
+@mock.patch.object(gha_utils, "FILE_COMMANDS_USE_RANDOM_DELIMITER", True)
+def test_set_output_random_delimiter(tmpdir: Any) -> None:
+    file = tmpdir.join("output_file")
+    value = "line 1\n100%\n\n"
+
+    with mock.patch.dict(os.environ, {"GITHUB_OUTPUT": file.strpath}):
+        gha_utils.set_output("test", value)
+        gha_utils.set_output_stream("stream", iter(["line 1\n", "100%\n\n"]))
+
+    assert list(gha_utils.iter_file_commands(file.strpath))[:2] == [
+        ("test", value),
+        ("stream", value),
+    ]
+
+
+def test__check_delimiter() -> None:
+    assert list(gha_utils._check_delimiter([b"xa", b"cb"], b"ab")) == [b"xa", b"cb"]
+
+    with pytest.raises(ValueError):
+        list(gha_utils._check_delimiter([b"x", b"a", b"bx"], b"ab"))
+
+
 @pytest.mark.parametrize(
     "test_input,expected",
     [
@@ -242,6 +309,32 @@ def test_error(
     assert out == expected
 
 
+def test_emit_annotations(capfd: Any) -> None:
+    annotations = [
+        gha_utils.Annotation("error", "test error", file="abc.py", line=4),
+        gha_utils.Annotation("warning", "test warning", title="test, title"),
+        gha_utils.Annotation("error", "test error", file="abc.py", line=4),
+        gha_utils.Annotation("notice", "test notice"),
+    ]
+
+    gha_utils.emit_annotations(annotations)
+    out, err = capfd.readouterr()
+    assert out == (
+        "::error file=abc.py,line=4::test error\n"
+        "::warning title=test%2C title::test warning\n"
+        "::error file=abc.py,line=4::test error\n"
+        "::notice ::test notice\n"
+    )
+
+    gha_utils.emit_annotations(iter(annotations), deduplicate=True)
+    out, err = capfd.readouterr()
+    assert out == (
+        "::error file=abc.py,line=4::test error\n"
+        "::warning title=test%2C title::test warning\n"
+        "::notice ::test notice\n"
+    )
+
+
 def test_set_output(tmpdir: Any) -> None:
     file = tmpdir.join("output_file")
 
@@ -288,6 +381,362 @@ def test_save_state_deprecation_warning(tmpdir: Any) -> None:
             gha_utils.save_state("test", "test", use_subprocess=True)
 
 
+def test_set_outputs(tmpdir: Any) -> None:
+    file = tmpdir.join("output_file")
+
+    with mock.patch.dict(os.environ, {"GITHUB_OUTPUT": file.strpath}):
+        gha_utils.set_outputs({"test": "test"})
+        gha_utils.set_outputs(("key_" + str(i), i) for i in range(2))
+
+    assert file.read() == (
+        "test<<__ENV_DELIMITER__\n"
+        "test\n__ENV_DELIMITER__\n"
+        "key_0<<__ENV_DELIMITER__\n0\n__ENV_DELIMITER__\n"
+        "key_1<<__ENV_DELIMITER__\n1\n__ENV_DELIMITER__\n"
+    )
+
+
+def _slow_chunks(number: int) -> Iterator[str]:
+    # streamed records are written with many writes, slowly so they overlap
+    for _ in range(20):
+        time.sleep(0.001)
+        yield str(number) * 10_000
+
+
+def _set_large_outputs(number: int) -> None:
+    for index in range(10):
+        name = f"key_{number}_{index}"
+
+        if index % 2:
+            gha_utils.set_output(name, str(number) * 200_000)
+        else:
+            gha_utils.set_output_stream(name, _slow_chunks(number), max_size=None)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="requires fcntl")
+def test_set_output_with_lock_from_multiple_processes(tmpdir: Any) -> None:
+    file = tmpdir.join("output_file")
+    context = multiprocessing.get_context("spawn")
+
+    with mock.patch.dict(
+        os.environ,
+        {"GITHUB_OUTPUT": file.strpath, "FILE_COMMANDS_USE_LOCK": "true"},
+    ):
+        processes = [
+            context.Process(target=_set_large_outputs, args=(number,))
+            for number in range(8)
+        ]
+
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0
+
+    outputs = list(gha_utils.iter_file_commands(file.strpath))
+    assert len(outputs) == 80
+    assert {name for name, _ in outputs} == {
+        f"key_{number}_{index}" for number in range(8) for index in range(10)
+    }
+
+    for name, value in outputs:
+        assert value == name.split("_")[1] * 200_000
+
+
+def _stream_output(done: Any) -> None:
+    def chunks() -> Iterator[str]:
+        for _ in range(70):
+            time.sleep(0.001)
+            yield "x" * 3000
+
+    gha_utils.set_output_stream("big", chunks(), max_size=None)
+    done.set()
+
+
+def _set_small_outputs(number: int, done: Any) -> None:
+    # write until the streamed record is complete, with a limit in case it fails
+    for index in range(100_000):
+        if done.is_set() and index >= 10:
+            break
+        gha_utils.set_output(f"small_{number}_{index}", "v")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="requires fcntl")
+def test_set_output_stream_with_lock_and_small_writers(tmpdir: Any) -> None:
+    file = tmpdir.join("output_file")
+    context = multiprocessing.get_context("spawn")
+    done = context.Event()
+
+    with mock.patch.dict(
+        os.environ,
+        {"GITHUB_OUTPUT": file.strpath, "FILE_COMMANDS_USE_LOCK": "true"},
+    ):
+        processes = [context.Process(target=_stream_output, args=(done,))] + [
+            context.Process(target=_set_small_outputs, args=(number, done))
+            for number in range(2)
+        ]
+
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0
+
+    outputs = dict(gha_utils.iter_file_commands(file.strpath))
+    assert outputs.pop("big") == "x" * 210_000
+    assert outputs and set(outputs.values()) == {"v"}
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "line 1\n100%\r\nline 2",
+        b"line 1\n100%\r\nline 2",
+        io.BytesIO(b"line 1\n100%\r\nline 2"),
+        io.StringIO("line 1\n100%\r\nline 2"),
+        iter(["line 1\n", b"100%\r", "\nline 2"]),
+    ],
+)
+def test_set_output_stream(tmpdir: Any, value: Any) -> None:
+    file = tmpdir.join("output_file")
+
+    with mock.patch.dict(os.environ, {"GITHUB_OUTPUT": file.strpath}):
+        assert gha_utils.set_output_stream("test", value) is None
+
+    assert file.read_binary() == gha_utils._build_file_input(
+        "test", "line 1\n100%\r\nline 2"
+    )
+
+
+def test_set_output_stream_too_large(capfd: Any, tmpdir: Any) -> None:
+    file = tmpdir.join("output_file")
+    chunks = (f"line {i}\n" for i in range(100_000))
+
+    with mock.patch.dict(os.environ, {"GITHUB_OUTPUT": file.strpath}):
+        gha_utils.set_output_stream("test", chunks, max_size=1000)
+
+    out, err = capfd.readouterr()
+    assert out.startswith("::warning title=Value too large::")
+    assert file.read_binary() == gha_utils._build_file_input(
+        "test", "".join(f"line {i}\n" for i in range(100_000))
+    )
+
+
+def test_set_output_stream_spill(capfd: Any, tmpdir: Any) -> None:
+    file = tmpdir.join("output_file")
+    value = b"x\n" * 1000
+
+    with mock.patch.dict(os.environ, {"GITHUB_OUTPUT": file.strpath}):
+        path = gha_utils.set_output_stream(
+            "test", value, max_size=100, spill_dir=tmpdir.strpath
+        )
+
+    assert path is not None
+
+    with open(path, "rb") as f:
+        assert f.read() == value
+
+    assert list(gha_utils.iter_file_commands(file.strpath)) == [("test", path)]
+
+
+def test_set_output_stream_without_max_size(tmpdir: Any) -> None:
+    file = tmpdir.join("output_file")
+
+    def chunks() -> Iterator[str]:
+        yield "first\n"
+        # the chunks are written as they are read, not collected first
+        assert file.read() == "test<<__ENV_DELIMITER__\nfirst%0A"
+        yield "second"
+
+    with mock.patch.dict(os.environ, {"GITHUB_OUTPUT": file.strpath}):
+        assert gha_utils.set_output_stream("test", chunks(), max_size=None) is None
+
+    assert list(gha_utils.iter_file_commands(file.strpath)) == [
+        ("test", "first%0Asecond")
+    ]
+
+
+def test_set_output_stream_spill_name_with_path_separator(
+    capfd: Any, tmpdir: Any
+) -> None:
+    file = tmpdir.join("output_file")
+
+    with mock.patch.dict(os.environ, {"GITHUB_OUTPUT": file.strpath}):
+        path = gha_utils.set_output_stream(
+            "../reports/test", "x" * 1000, max_size=100, spill_dir=tmpdir.strpath
+        )
+
+    assert path is not None
+    assert os.path.dirname(path) == tmpdir.strpath
+    assert os.path.basename(path).startswith("..-reports-test-")
+
+
+def test_save_states(tmpdir: Any) -> None:
+    file = tmpdir.join("state_file")
+
+    with mock.patch.dict(os.environ, {"GITHUB_STATE": file.strpath}):
+        gha_utils.save_states([("test", "test"), ("another", 2)])
+
+    assert file.read() == (
+        "test<<__ENV_DELIMITER__\n"
+        "test\n__ENV_DELIMITER__\n"
+        "another<<__ENV_DELIMITER__\n2\n"
+        "__ENV_DELIMITER__\n"
+    )
+
+
+def _record_commands(number: int) -> gha_utils.CommandRecorder:
+    with gha_utils.record_commands() as recorder:
+        gha_utils.set_output("count", 1)
+        gha_utils.set_output(f"key_{number}", number)
+        gha_utils.set_env("LAST", number)
+        gha_utils.save_state("state", number)
+        gha_utils.warning("test warning", file="abc.py")
+    return recorder
+
+
+def test_record_commands(capfd: Any, tmpdir: Any) -> None:
+    output_file = tmpdir.join("output_file")
+    env_file = tmpdir.join("envfile")
+    state_file = tmpdir.join("state_file")
+    recorder = gha_utils.CommandRecorder()
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        for worker_recorder in executor.map(_record_commands, range(3)):
+            recorder.merge(worker_recorder, reducers={"count": lambda a, b: a + b})
+
+    out, err = capfd.readouterr()
+    assert out == ""
+
+    with mock.patch.dict(
+        os.environ,
+        {
+            "GITHUB_OUTPUT": output_file.strpath,
+            "GITHUB_ENV": env_file.strpath,
+            "GITHUB_STATE": state_file.strpath,
+        },
+    ):
+        recorder.commit(deduplicate_annotations=True)
+
+    out, err = capfd.readouterr()
+    assert out == "::warning file=abc.py::test warning\n"
+    assert list(gha_utils.iter_file_commands(output_file.strpath)) == [
+        ("count", "3"),
+        ("key_0", "0"),
+        ("key_1", "1"),
+        ("key_2", "2"),
+    ]
+    assert list(gha_utils.iter_file_commands(env_file.strpath)) == [("LAST", "2")]
+    assert list(gha_utils.iter_file_commands(state_file.strpath)) == [("state", "2")]
+
+
+def test_buffer_file_commands(tmpdir: Any) -> None:
+    output_file = tmpdir.join("output_file")
+    env_file = tmpdir.join("envfile")
+
+    with mock.patch.dict(
+        os.environ,
+        {"GITHUB_OUTPUT": output_file.strpath, "GITHUB_ENV": env_file.strpath},
+    ):
+        with gha_utils.buffer_file_commands():
+            gha_utils.set_output("test", "test")
+            gha_utils.set_env("another", 2)
+
+            assert not output_file.exists()
+            assert not env_file.exists()
+
+    assert output_file.read() == "test<<__ENV_DELIMITER__\ntest\n__ENV_DELIMITER__\n"
+    assert env_file.read() == "another<<__ENV_DELIMITER__\n2\n__ENV_DELIMITER__\n"
+
+
+def test_nested_buffer_file_commands(tmpdir: Any) -> None:
+    output_file = tmpdir.join("output_file")
+    env_file = tmpdir.join("envfile")
+
+    with mock.patch.dict(
+        os.environ,
+        {"GITHUB_OUTPUT": output_file.strpath, "GITHUB_ENV": env_file.strpath},
+    ):
+        with gha_utils.buffer_file_commands():
+            gha_utils.set_env("A", "1")
+            gha_utils.set_output("o", "buffered")
+
+            with gha_utils.buffer_file_commands():
+                assert gha_utils.get_env("A") == "1"
+
+                gha_utils.set_env("A", "2")
+                gha_utils.set_output_stream("o", "streamed", max_size=None)
+
+    assert list(gha_utils.iter_file_commands(env_file.strpath)) == [
+        ("A", "1"),
+        ("A", "2"),
+    ]
+    assert list(gha_utils.iter_file_commands(output_file.strpath)) == [
+        ("o", "buffered"),
+        ("o", "streamed"),
+    ]
+
+
+def test_file_command_writer_flushes_whole_records(tmpdir: Any) -> None:
+    file = tmpdir.join("output_file")
+    record = gha_utils._build_file_input("test", "test")
+    writer = gha_utils.FileCommandWriter(buffer_size=len(record) * 2)
+
+    writer.write(file.strpath, record)
+    assert not file.exists()
+
+    writer.write(file.strpath, record)
+    writer.write(file.strpath, record)
+    assert file.read_binary() == record * 2
+
+    writer.close()
+    assert file.read_binary() == record * 3
+
+
+def test_buffer_file_commands_from_multiple_threads(tmpdir: Any) -> None:
+    file = tmpdir.join("output_file")
+
+    def work(number: int) -> None:
+        for i in range(2000):
+            gha_utils.set_output(f"output_{number}_{i}", i)
+
+    # switch threads as often as possible to make races likely
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    try:
+        with mock.patch.dict(os.environ, {"GITHUB_OUTPUT": file.strpath}):
+            with gha_utils.buffer_file_commands(buffer_size=2048):
+                with ThreadPoolExecutor(max_workers=16) as executor:
+                    list(executor.map(work, range(16)))
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    outputs = dict(gha_utils.iter_file_commands(file.strpath))
+    assert len(outputs) == 16 * 2000
+
+
+def _set_worker_output(number: int) -> None:
+    gha_utils.set_output(f"worker_{number}", number)
+
+
+@pytest.mark.skipif(not hasattr(os, "register_at_fork"), reason="requires fork")
+def test_buffer_file_commands_in_forked_workers(tmpdir: Any) -> None:
+    file = tmpdir.join("output_file")
+    context = multiprocessing.get_context("fork")
+
+    with mock.patch.dict(os.environ, {"GITHUB_OUTPUT": file.strpath}):
+        with gha_utils.buffer_file_commands():
+            gha_utils.set_output("parent", "parent")
+
+            with ProcessPoolExecutor(max_workers=4, mp_context=context) as executor:
+                list(executor.map(_set_worker_output, range(8)))
+
+    assert sorted(gha_utils.iter_file_commands(file.strpath)) == sorted(
+        [("parent", "parent")] + [(f"worker_{i}", str(i)) for i in range(8)]
+    )
+
+
 @mock.patch.dict(os.environ, {"STATE_test_state": "test", "abc": "another test"})
 def test_get_state() -> None:
     assert gha_utils.get_state("test_state") == "test"
@@ -300,6 +749,80 @@ def test_get_user_input() -> None:
     assert gha_utils.get_user_input("another") is None
 
 
+@pytest.mark.parametrize(
+    "value,input_type,expected",
+    [
+        ("true", "bool", True),
+        ("FALSE", "bool", False),
+        ("42", "int", 42),
+        ("3.14", "float", 3.14),
+        ("a.py\nb.py, c.py\n\n", "list", ["a.py", "b.py", "c.py"]),
+        ('{"key": [1, 2]}', "json", {"key": [1, 2]}),
+        ("", "bool", None),
+    ],
+)
+def test_get_user_input_as(value: str, input_type: Any, expected: Any) -> None:
+    with mock.patch.dict(os.environ, {"INPUT_MY_INPUT": value}):
+        assert gha_utils.get_user_input_as("my_input", input_type) == expected
+
+
+def test_get_user_input_as_cache() -> None:
+    with mock.patch.dict(os.environ, {"INPUT_CONFIG": '{"key": 1}'}):
+        config = gha_utils.get_user_input_as("config", "json")
+        assert gha_utils.get_user_input_as("config", "json") is config
+
+        os.environ["INPUT_CONFIG"] = '{"key": 2}'
+        assert gha_utils.get_user_input_as("config", "json") == {"key": 2}
+
+        os.environ["INPUT_CONFIG"] = "yes"
+
+        with pytest.raises(TypeError):
+            gha_utils.get_user_input_as("config", "bool")
+
+    assert gha_utils.get_user_input_as("config", "bool", default=True) is True
+
+
+def test_runner_context() -> None:
+    context = gha_utils.RunnerContext(
+        {
+            "INPUT_FLAG": "true",
+            "INPUT_COUNT": "3",
+            "INPUT_FILES": "a.py, b.py\nc.py\n",
+            "INPUT_CONFIG": '{"key": [1, 2]}',
+            "INPUT_INVALID": "yes",
+            "STATE_test_state": "test",
+            "GITHUB_REPOSITORY": "octocat/Hello-World",
+            "OTHER": "other",
+        }
+    )
+
+    assert context.get_input("flag") == "true"
+    assert context.get_input_as("flag", "bool") is True
+    assert context.get_input_as("count", "int") == 3
+    assert context.get_input_as("files", "list") == ["a.py", "b.py", "c.py"]
+    assert context.get_input_as("config", "json") == {"key": [1, 2]}
+    assert context.get_input_as("config", "json") is context.get_input_as(
+        "config", "json"
+    )
+    assert context.get_input_as("missing", "bool", default=False) is False
+    assert context.get_state("test_state") == "test"
+    assert context.get("GITHUB_REPOSITORY") == "octocat/Hello-World"
+    assert context.get("OTHER") is None
+
+    with pytest.raises(TypeError):
+        context.get_input_as("invalid", "bool")
+
+
+@mock.patch.dict(os.environ, {"INPUT_USERNAME": "test"})
+def test_runner_context_snapshot() -> None:
+    gha_utils.runner_context.cache_clear()
+    context = gha_utils.runner_context()
+
+    assert context is gha_utils.runner_context()
+    assert context.get_input("username") == "test"
+    gha_utils.runner_context.cache_clear()
+
+
 @pytest.mark.parametrize(
     "test_input,expected",
     [
@@ -321,6 +844,216 @@ def test_end_group(capfd: Any) -> None:
     assert out == "::endgroup::\n"
 
 
+def test_group(capfd: Any) -> None:
+    with gha_utils.group("test"):
+        gha_utils.echo("message")
+
+    out, err = capfd.readouterr()
+    assert out == "::group ::test\nmessage\n::endgroup::\n"
+
+
+def test_group_buffered_in_threads(capfd: Any) -> None:
+    def work(number: int) -> None:
+        with gha_utils.group(f"group {number}"):
+            for line in range(50):
+                gha_utils.echo(f"{number}-{line}")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(work, range(16)))
+
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 16 * 52
+
+    for start in range(0, len(lines), 52):
+        number = lines[start][len("::group ::group ") :]
+        assert lines[start + 1 : start + 51] == [f"{number}-{i}" for i in range(50)]
+        assert lines[start + 51] == "::endgroup::"
+
+
+def test_timed_group(capfd: Any) -> None:
+    gha_utils.clear_group_timings()
+
+    with gha_utils.timed_group("test"):
+        gha_utils.echo("message")
+
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[:2] == ["::group ::test", "message"]
+    assert lines[2].startswith("::debug ::test took ")
+    assert "CPU" in lines[2] and "process peak RSS" in lines[2]
+    assert lines[3] == "::endgroup::"
+
+    (timing,) = gha_utils.group_timings()
+    assert timing.title == "test"
+    assert timing.wall_time >= 0
+    assert timing.cpu_time >= 0
+
+    if sys.platform != "win32":
+        assert timing.peak_rss is not None and timing.peak_rss > 0
+
+    gha_utils.clear_group_timings()
+    assert gha_utils.group_timings() == []
+
+
+def test_timed_group_records_on_error(capfd: Any) -> None:
+    gha_utils.clear_group_timings()
+
+    with pytest.raises(RuntimeError):
+        with gha_utils.timed_group("failing"):
+            raise RuntimeError
+
+    assert [timing.title for timing in gha_utils.group_timings()] == ["failing"]
+    gha_utils.clear_group_timings()
+
+
+def test_append_group_timings_summary(tmpdir: Any) -> None:
+    file = tmpdir.join("summary")
+    timings = [
+        gha_utils.GroupTiming("fast", 0.5, 0.25, 2 * 1024 * 1024),
+        gha_utils.GroupTiming("slow", 1.5, 1.0, None),
+    ]
+
+    with mock.patch.dict(os.environ, {"GITHUB_STEP_SUMMARY": file.strpath}):
+        gha_utils.append_group_timings_summary([])
+        assert not file.exists()
+
+        gha_utils.append_group_timings_summary(timings)
+
+    assert file.read() == (
+        "| Group | Wall time | CPU time | Process peak RSS |\n"
+        "|---|---|---|---|\n"
+        "| slow | 1.500s | 1.000s | n/a |\n"
+        "| fast | 0.500s | 0.250s | 2.0 MiB |\n"
+    )
+
+
+def _profiled_function() -> int:
+    return sum(range(1000))
+
+
+def test_profiled_group(tmpdir: Any, capfd: Any) -> None:
+    summary = tmpdir.join("summary")
+
+    with mock.patch.dict(
+        os.environ,
+        {"GITHUB_STEP_SUMMARY": summary.strpath, "RUNNER_TEMP": tmpdir.strpath},
+    ):
+        with gha_utils.profiled_group("Build step", top=5):
+            _profiled_function()
+
+    (profile,) = tmpdir.listdir("*.prof")
+    assert profile.basename.startswith("Build-step-")
+    stats = pstats.Stats(profile.strpath).stats  # type: ignore[attr-defined]
+    assert any(name == "_profiled_function" for _, _, name in stats)
+
+    lines = summary.read().splitlines()
+    assert lines[:4] == [
+        "<details>",
+        "<summary>Build step: top functions by cumulative time</summary>",
+        "",
+        "| Function | Calls | Own time | Cumulative time |",
+    ]
+    assert any("| `_profiled_function (tests" in line for line in lines)
+    assert any("| `<built-in method builtins.sum>` |" in line for line in lines)
+    assert f"Raw profile: `{profile.strpath}`" in lines
+    assert lines[-1] == "</details>"
+
+    out, err = capfd.readouterr()
+    assert out.startswith("::group ::Build step\n")
+    assert f"::debug ::Build step profile saved to {profile.strpath}\n" in out
+    assert out.endswith("::endgroup::\n")
+
+
+def test_profiled_group_without_runner_environment(capfd: Any) -> None:
+    with mock.patch.dict(os.environ):
+        os.environ.pop("GITHUB_STEP_SUMMARY", None)
+        os.environ.pop("RUNNER_TEMP", None)
+
+        with gha_utils.profiled_group("test") as profiler:
+            _profiled_function()
+
+    assert gha_utils.write_profile_report(profiler) is None
+
+
+def test_profile_summary_environment_variable(tmpdir: Any) -> None:
+    summary = tmpdir.join("summary")
+    env = dict(
+        os.environ,
+        PROFILE_SUMMARY="true",
+        GITHUB_STEP_SUMMARY=summary.strpath,
+        RUNNER_TEMP=tmpdir.strpath,
+    )
+
+    subprocess.run(
+        [sys.executable, "-c", "import github_action_utils; sum(range(1000))"],
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        check=True,
+    )
+
+    assert len(tmpdir.listdir("Process-profile-*.prof")) == 1
+    assert "<summary>Process profile: top functions" in summary.read()
+
+
+def test_nested_profiled_group(tmpdir: Any, capfd: Any) -> None:
+    summary = tmpdir.join("summary")
+
+    with mock.patch.dict(
+        os.environ,
+        {"GITHUB_STEP_SUMMARY": summary.strpath, "RUNNER_TEMP": tmpdir.strpath},
+    ):
+        with gha_utils.profiled_group("outer") as outer_profiler:
+            with gha_utils.profiled_group("inner") as inner_profiler:
+                _profiled_function()
+
+    assert inner_profiler is outer_profiler
+    assert len(tmpdir.listdir("*.prof")) == 1
+    assert "_profiled_function (tests" in summary.read()
+
+    out, err = capfd.readouterr()
+    assert "::debug ::inner is not profiled separately" in out
+
+
+def test_profiled_group_with_profile_summary(tmpdir: Any) -> None:
+    summary = tmpdir.join("summary")
+    env = dict(
+        os.environ,
+        PROFILE_SUMMARY="true",
+        GITHUB_STEP_SUMMARY=summary.strpath,
+        RUNNER_TEMP=tmpdir.strpath,
+    )
+    code = (
+        "import github_action_utils as gha_utils\n"
+        "def in_group(): return sum(range(1000))\n"
+        "def after_group(): return sum(range(1000))\n"
+        "with gha_utils.profiled_group('group'):\n"
+        "    in_group()\n"
+        "after_group()\n"
+    )
+
+    subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        check=True,
+        stdout=subprocess.PIPE,
+    )
+
+    (profile,) = tmpdir.listdir("*.prof")
+    assert profile.basename.startswith("Process-profile-")
+
+    stats = pstats.Stats(profile.strpath).stats  # type: ignore[attr-defined]
+    assert {"in_group", "after_group"} <= {name for _, _, name in stats}
+
+
+@pytest.fixture(autouse=True)
+def clear_mask_registry() -> Iterator[None]:
+    gha_utils._mask_registry.clear()
+    yield
+    gha_utils._mask_registry.clear()
+
+
 @pytest.mark.parametrize(
     "test_input,expected",
     [
@@ -344,6 +1077,91 @@ def test_add_mask(capfd: Any, test_input: str, expected: str) -> None:
     assert out == expected
 
 
+def test_add_mask_deduplicates(capfd: Any) -> None:
+    gha_utils.add_mask("secret")
+    gha_utils.add_mask("secret")
+    gha_utils.add_mask("")
+
+    out, err = capfd.readouterr()
+    assert out == "::add-mask ::secret\n"
+    assert "secret" in gha_utils._mask_registry
+    assert len(gha_utils._mask_registry) == 1
+
+
+def test_add_masks(capfd: Any) -> None:
+    gha_utils.add_mask("token-1")
+
+    assert gha_utils.add_masks(["token-1", "token-2", "token-2", "a\nb"]) == 2
+    assert gha_utils.add_masks(["token-2"]) == 0
+
+    out, err = capfd.readouterr()
+    assert out == ("::add-mask ::token-1\n::add-mask ::token-2\n::add-mask ::a%0Ab\n")
+
+
+def test_redact(capfd: Any) -> None:
+    assert gha_utils.redact("nothing is masked") == "nothing is masked"
+
+    gha_utils.add_masks(["ab", "abc", "abde", "x.y", "a\nb"])
+
+    assert (
+        gha_utils.redact("ab abc abdf abde x.y xzy a\nb")
+        == "*** *** ***df *** *** xzy ***"
+    )
+    assert gha_utils.redact("abc", replacement="\\1") == "\\1"
+
+    gha_utils.add_mask("abdf")
+    assert gha_utils.redact("abdf") == "***"
+
+
+def test_redact_deeply_nested_values(capfd: Any) -> None:
+    gha_utils.add_masks("a" * length for length in range(1, 600))
+
+    assert gha_utils.redact("b" + "a" * 1000) == "b******"
+
+
+@mock.patch.object(gha_utils, "COMMANDS_USE_REDACTION", True)
+def test_echo_redaction(capfd: Any) -> None:
+    gha_utils.add_mask("secret")
+    gha_utils.echo("the secret is secret")
+    gha_utils.warning("secret found", title="secret")
+    gha_utils.add_masks(["secret-2"])
+
+    out, err = capfd.readouterr()
+    assert out == (
+        "::add-mask ::secret\n"
+        "the *** is ***\n"
+        "::warning title=***::*** found\n"
+        "::add-mask ::secret-2\n"
+    )
+
+
+@mock.patch.object(gha_utils, "COMMANDS_USE_REDACTION", True)
+def test_add_mask_in_buffered_group_with_redaction(capfd: Any) -> None:
+    with gha_utils.group("main thread", buffered=True):
+        gha_utils.add_mask("s3cr3t")
+        gha_utils.echo("s3cr3t")
+
+    def work() -> None:
+        with gha_utils.group("worker thread"):
+            gha_utils.add_masks(["t0ken"])
+            gha_utils.echo("s3cr3t t0ken")
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(work).result()
+
+    out, err = capfd.readouterr()
+    assert out == (
+        "::group ::main thread\n"
+        "::add-mask ::s3cr3t\n"
+        "***\n"
+        "::endgroup::\n"
+        "::group ::worker thread\n"
+        "::add-mask ::t0ken\n"
+        "*** ***\n"
+        "::endgroup::\n"
+    )
+
+
 def test_begin_stop_commands(capfd: Any) -> None:
     gha_utils.begin_stop_commands(token="test token")
     out, err = capfd.readouterr()
@@ -371,6 +1189,20 @@ def test_set_env(tmpdir: Any) -> None:
     )
 
 
+def test_set_envs(tmpdir: Any) -> None:
+    file = tmpdir.join("envfile")
+
+    with mock.patch.dict(os.environ, {"GITHUB_ENV": file.strpath}):
+        gha_utils.set_envs({"test": "test", "another": 2})
+
+    assert file.read() == (
+        "test<<__ENV_DELIMITER__\n"
+        "test\n__ENV_DELIMITER__\n"
+        "another<<__ENV_DELIMITER__\n2\n"
+        "__ENV_DELIMITER__\n"
+    )
+
+
 def test_get_workflow_environment_variables(tmpdir: Any) -> None:
     file = tmpdir.join("envfile")
 
@@ -382,12 +1214,84 @@ def test_get_workflow_environment_variables(tmpdir: Any) -> None:
     assert data == {"test": "test", "another": "2"}
 
 
+def test_iter_file_commands(tmpdir: Any) -> None:
+    file = tmpdir.join("output_file")
+    file.write(
+        "short=value=with=equals\n"
+        "\n"
+        "multi<<EOF\n"
+        "line 1\r\n"
+        "line 2\n"
+        "EOF\n"
+        "empty<<ghadelimiter_1\n"
+        "ghadelimiter_1\n"
+        "incomplete<<EOF\n"
+        "value\n"
+    )
+
+    assert list(gha_utils.iter_file_commands(file.strpath)) == [
+        ("short", "value=with=equals"),
+        ("multi", "line 1\nline 2"),
+        ("empty", ""),
+    ]
+
+
 @mock.patch.dict(os.environ, {"GITHUB_ACTOR": "test", "ANOTHER": "another test"})
 def test_get_env() -> None:
     assert gha_utils.get_env("GITHUB_ACTOR") == "test"
     assert gha_utils.get_env("ANOTHER") == "another test"
 
 
+def test_get_env_from_env_file(tmpdir: Any) -> None:
+    file = tmpdir.join("envfile")
+
+    with mock.patch.dict(os.environ, {"GITHUB_ENV": file.strpath}):
+        gha_utils.set_env("test", "test")
+        assert gha_utils.get_env("test") == "test"
+        offset = gha_utils._env_file_index.offset
+
+        gha_utils.set_env("another", 2)
+        file.write("incomplete<<__ENV_DELIMITER__\nvalue\n", mode="a")
+        assert gha_utils.get_env("another") == "2"
+        assert gha_utils.get_env("incomplete") is None
+        assert gha_utils.get_env("test") == "test"
+        assert gha_utils._env_file_index.offset > offset
+
+        file.write("__ENV_DELIMITER__\n", mode="a")
+        assert gha_utils.get_env("incomplete") == "value"
+        assert gha_utils._env_file_index.offset == os.path.getsize(file.strpath)
+
+
+def test_get_env_from_unterminated_env_file(tmpdir: Any) -> None:
+    file = tmpdir.join("envfile")
+    file.write("A=1\nB=2")
+
+    with mock.patch.dict(os.environ, {"GITHUB_ENV": file.strpath}):
+        assert gha_utils.get_env("A") == "1"
+        assert gha_utils.get_env("B") == "2"
+        assert gha_utils._env_file_index.offset == len("A=1\n")
+
+        with mock.patch("builtins.open") as mocked_open:
+            assert gha_utils.get_env("B") == "2"
+        mocked_open.assert_not_called()
+
+        file.write("3\nC=4\n", mode="a")
+        assert gha_utils.get_env("B") == "23"
+        assert gha_utils.get_env("C") == "4"
+        assert gha_utils._env_file_index.offset == os.path.getsize(file.strpath)
+
+
+def test_environment_files_are_opened_in_binary_mode(tmpdir: Any) -> None:
+    file = tmpdir.join("envfile")
+
+    with mock.patch.object(os, "O_BINARY", 0x8000, create=True), mock.patch.object(
+        os, "open", return_value=-1
+    ) as mocked_open:
+        assert gha_utils._open_for_append(file.strpath) == -1
+
+    assert mocked_open.call_args[0][1] & 0x8000
+
+
 def test_append_job_summary(tmpdir: Any) -> None:
     file = tmpdir.join("summary")
 
@@ -398,6 +1302,85 @@ def test_append_job_summary(tmpdir: Any) -> None:
     assert file.read() == "# TEST\n- point 1\n"
 
 
+def test_job_summary(tmpdir: Any) -> None:
+    file = tmpdir.join("summary")
+    file.write("# TEST\n")
+
+    with mock.patch.dict(os.environ, {"GITHUB_STEP_SUMMARY": file.strpath}):
+        with gha_utils.JobSummary() as summary:
+            assert summary.size == 7
+            summary.heading("Results", level=2)
+            summary.table(iter([("a", 1), ("b", 2)]), header=("name", "count"))
+            summary.code_block("print(1)", language="python")
+
+    assert file.read() == (
+        "# TEST\n"
+        "## Results\n"
+        "| name | count |\n"
+        "|---|---|\n"
+        "| a | 1 |\n"
+        "| b | 2 |\n"
+        "```python\nprint(1)\n```\n"
+    )
+
+
+def test_markdown_table() -> None:
+    rows = (("a|b", "line 1\nline 2"), ("c", 3), ("d", 4), ("e", 5))
+
+    assert list(gha_utils.markdown_table(rows, header=("name", "value"))) == [
+        "| name | value |",
+        "|---|---|",
+        "| a\\|b | line 1<br>line 2 |",
+        "| c | 3 |",
+        "| d | 4 |",
+        "| e | 5 |",
+    ]
+    assert list(gha_utils.markdown_table(iter(rows), ("name", "value"), 2)) == [
+        "| name | value |",
+        "|---|---|",
+        "| a\\|b | line 1<br>line 2 |",
+        "| c | 3 |",
+        "",
+        "_2 more rows truncated_",
+    ]
+
+
+def test_markdown_list() -> None:
+    assert list(gha_utils.markdown_list(["a", "b"])) == ["- a", "- b"]
+    assert list(gha_utils.markdown_list(range(3), ordered=True, max_items=1)) == [
+        "1. 0",
+        "",
+        "_2 more items truncated_",
+    ]
+
+
+def test_job_summary_details(tmpdir: Any) -> None:
+    file = tmpdir.join("summary")
+
+    with mock.patch.dict(os.environ, {"GITHUB_STEP_SUMMARY": file.strpath}):
+        with gha_utils.JobSummary() as summary:
+            summary.details("Failures", gha_utils.markdown_list(["test_a"]))
+            summary.list_items(["test_b"], ordered=True)
+
+    assert file.read() == (
+        "<details>\n<summary>Failures</summary>\n\n- test_a\n\n</details>\n"
+        "1. test_b\n"
+    )
+
+
+def test_job_summary_size_limit(tmpdir: Any) -> None:
+    file = tmpdir.join("summary")
+
+    with mock.patch.dict(os.environ, {"GITHUB_STEP_SUMMARY": file.strpath}):
+        with gha_utils.JobSummary(overwrite=True, size_limit=10) as summary:
+            summary.write("- point 1")
+
+            with pytest.raises(ValueError):
+                summary.write("- point 2")
+
+    assert file.read() == "- point 1\n"
+
+
 def test_overwrite_job_summary(tmpdir: Any) -> None:
     file = tmpdir.join("summary")
 
@@ -435,3 +1418,250 @@ def test_event_payload(tmpdir: Any) -> None:
         data = gha_utils.event_payload()
 
     assert data == payload
+
+
+def test_event_payload_cache(tmpdir: Any) -> None:
+    file = tmpdir.join("event")
+    file.write(json.dumps({"test": "test"}))
+
+    with mock.patch.dict(os.environ, {"GITHUB_EVENT_PATH": file.strpath}):
+        assert gha_utils.event_payload() == {"test": "test"}
+
+        file.write(json.dumps({"test": "changed"}))
+        assert gha_utils.event_payload() == {"test": "changed"}
+
+        with mock.patch("json.load") as json_load:
+            gha_utils.event_payload()
+            gha_utils.clear_event_payload_cache()
+            gha_utils.event_payload()
+
+        assert json_load.call_count == 1
+
+
+def test_event_payload_cache_clear_is_deprecated(tmpdir: Any) -> None:
+    file = tmpdir.join("event")
+    file.write(json.dumps({"test": "test"}))
+
+    with mock.patch.dict(os.environ, {"GITHUB_EVENT_PATH": file.strpath}):
+        gha_utils.event_payload()
+
+        with mock.patch("json.load") as json_load:
+            with pytest.deprecated_call():
+                gha_utils.event_payload.cache_clear()  # type: ignore[attr-defined]
+            gha_utils.event_payload()
+
+        assert json_load.call_count == 1
+
+
+def test_event_payload_snapshot(tmpdir: Any) -> None:
+    file = tmpdir.join("event")
+    payload = {"test": "test", "number": 1, "list": [None, True, 1.5]}
+    file.write(json.dumps(payload))
+
+    with mock.patch.dict(
+        os.environ,
+        {"GITHUB_EVENT_PATH": file.strpath, "RUNNER_TEMP": tmpdir.strpath},
+    ):
+        gha_utils.clear_event_payload_cache()
+        assert gha_utils.event_payload(use_snapshot=True) == payload
+        assert len(tmpdir.listdir("*.marshal")) == 1
+
+        gha_utils.clear_event_payload_cache()
+
+        with mock.patch("json.load", side_effect=AssertionError):
+            assert gha_utils.event_payload(use_snapshot=True) == payload
+
+
+def test_event_value(tmpdir: Any) -> None:
+    file = tmpdir.join("event")
+    payload = {
+        "action": "opened",
+        "body": 'text with "quotes", {braces} and [brackets] \\',
+        "commits": [{"id": "a"}, {"id": "b", "nested": [1, {"x": None}]}],
+        "pull_request": {"number": 7, "head": {"sha": "abc", "ref": "main"}},
+        "repository": {"full_name": "octocat/Hello-World"},
+        "escaped\nkey": True,
+    }
+    file.write(json.dumps(payload, indent=2))
+
+    with mock.patch.dict(os.environ, {"GITHUB_EVENT_PATH": file.strpath}):
+        assert gha_utils.event_value("action") == "opened"
+        assert gha_utils.event_value("body") == payload["body"]
+        assert gha_utils.event_value("pull_request.head.sha") == "abc"
+        assert gha_utils.event_value("pull_request.number") == 7
+        assert gha_utils.event_value("commits.1.id") == "b"
+        assert gha_utils.event_value("commits.1.nested") == [1, {"x": None}]
+        assert gha_utils.event_value("escaped\nkey") is True
+        assert gha_utils.event_value("commits.2.id") is None
+        assert gha_utils.event_value("action.name", "default") == "default"
+        assert gha_utils.event_value("missing", "default") == "default"
+
+        info = gha_utils.event_info()
+
+    assert info == gha_utils.EventInfo(
+        action="opened",
+        repository="octocat/Hello-World",
+        sender=None,
+        number=7,
+        ref="main",
+        sha="abc",
+    )
+
+
+def test_async_functions(capfd: Any, tmpdir: Any) -> None:
+    output_file = tmpdir.join("output_file")
+    summary_file = tmpdir.join("summary")
+
+    async def run() -> None:
+        await asyncio.gather(
+            *[gha_utils.aset_output(f"key_{i}", i) for i in range(20)],
+            *[gha_utils.anotice(f"notice {i}", line=i) for i in range(20)],
+        )
+        await gha_utils.aappend_job_summary("# TEST")
+
+    loop = asyncio.new_event_loop()
+
+    with mock.patch.dict(
+        os.environ,
+        {
+            "GITHUB_OUTPUT": output_file.strpath,
+            "GITHUB_STEP_SUMMARY": summary_file.strpath,
+        },
+    ):
+        try:
+            loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+    out, err = capfd.readouterr()
+    assert out == "".join(f"::notice line={i}::notice {i}\n" for i in range(20))
+    assert list(gha_utils.iter_file_commands(output_file.strpath)) == [
+        (f"key_{i}", str(i)) for i in range(20)
+    ]
+    assert summary_file.read() == "# TEST\n"
+
+
+def test_more_async_functions(capfd: Any, tmpdir: Any) -> None:
+    env_file = tmpdir.join("envfile")
+    state_file = tmpdir.join("state_file")
+    path_file = tmpdir.join("path_file")
+    summary_file = tmpdir.join("summary")
+    summary_file.write("old summary\n")
+
+    async def run() -> None:
+        await gha_utils.aset_envs({"A": 1, "B": 2})
+        await gha_utils.asave_states([("state", "value")])
+        await gha_utils.aoverwrite_job_summary("# TEST")
+        await gha_utils.aadd_mask("secret")
+        assert await gha_utils.aadd_masks(["secret", "other"]) == 1
+        await gha_utils.aadd_system_path("/usr/local/test")
+
+    with mock.patch.dict(
+        os.environ,
+        {
+            "GITHUB_ENV": env_file.strpath,
+            "GITHUB_STATE": state_file.strpath,
+            "GITHUB_PATH": path_file.strpath,
+            "GITHUB_STEP_SUMMARY": summary_file.strpath,
+        },
+    ):
+        loop = asyncio.new_event_loop()
+
+        try:
+            loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+    out, err = capfd.readouterr()
+    assert out == "::add-mask ::secret\n::add-mask ::other\n"
+    assert list(gha_utils.iter_file_commands(env_file.strpath)) == [
+        ("A", "1"),
+        ("B", "2"),
+    ]
+    assert list(gha_utils.iter_file_commands(state_file.strpath)) == [
+        ("state", "value")
+    ]
+    assert path_file.read() == "/usr/local/test"
+    assert summary_file.read() == "# TEST\n"
+
+
+def test_async_functions_use_recorder_and_buffer_of_caller(
+    capfd: Any, tmpdir: Any
+) -> None:
+    output_file = tmpdir.join("output_file")
+
+    async def run() -> gha_utils.CommandRecorder:
+        with gha_utils.record_commands() as recorder:
+            gha_utils.set_output("sync", 1)
+            await gha_utils.aset_output("async", 2)
+            await gha_utils.awarning("recorded")
+
+        with gha_utils.buffer_output():
+            await gha_utils.aecho("buffered")
+            assert capfd.readouterr().out == ""
+
+        return recorder
+
+    with mock.patch.dict(os.environ, {"GITHUB_OUTPUT": output_file.strpath}):
+        loop = asyncio.new_event_loop()
+
+        try:
+            recorder = loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+    assert not output_file.exists()
+    assert recorder.outputs == {"sync": 1, "async": 2}
+    assert [annotation.message for annotation in recorder.annotations] == ["recorded"]
+    assert capfd.readouterr().out == "buffered\n"
+
+
+LAZY_IMPORTED_MODULES = {
+    "asyncio",
+    "cProfile",
+    "concurrent.futures",
+    "hashlib",
+    "json",
+    "mmap",
+    "pstats",
+    "subprocess",
+    "tempfile",
+    "uuid",
+}
+IMPORT_TIME_BUDGET_US = 75_000
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="requires -X importtime")
+def test_import_time() -> None:
+    command = [sys.executable, "-X", "importtime", "-c", "import github_action_utils"]
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {key: value for key, value in os.environ.items() if key != "PROFILE_SUMMARY"}
+
+    # the first import may compile the module, only the second one is measured
+    subprocess.run(command, cwd=cwd, env=env, check=True, stderr=subprocess.PIPE)
+    result = subprocess.run(
+        command,
+        cwd=cwd,
+        env=env,
+        check=True,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+    # lines look like "import time: self [us] | cumulative | imported package",
+    # modules imported by a module are indented and listed before it
+    imported: List[str] = []
+    for line in result.stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+
+        if name.strip() == "github_action_utils":
+            break
+        if not name.startswith("  "):
+            imported.clear()
+        else:
+            imported.append(name.strip())
+    else:
+        pytest.fail("github_action_utils was not imported")
+
+    assert not LAZY_IMPORTED_MODULES.intersection(imported)
+    assert int(cumulative) < IMPORT_TIME_BUDGET_US